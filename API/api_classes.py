@@ -46,6 +46,7 @@ class TimestepCue(Resource):
                     config.goal_level = config.PERSON_GOAL
                     config.completed = config.COMPLETED_STATUS_UNDEFINED
 
+                    config.guide_update.set()
                     # Wait for the behaviour tree to execute for the person goal.
                     while config.completed == config.COMPLETED_STATUS_UNDEFINED:
                         pass
@@ -73,6 +74,7 @@ class TimestepCue(Resource):
                         config.completed = config.COMPLETED_STATUS_UNDEFINED
                         config.session_finished = True
 
+                        config.guide_update.set()
                         # Wait for the behaviour tree to execute for the session goal.
                         while config.completed == config.COMPLETED_STATUS_UNDEFINED:
                             pass
@@ -94,6 +96,7 @@ class TimestepCue(Resource):
                             config.pause_display = True
                             config.goal_level = config.EXERCISE_GOAL
                             config.MAX_SESSION_TIME = 1  # Session will stop because time is now > MAX_SESSION_TIME
+                        config.guide_update.set()
 
                         new_data = {
                             'goal_level': 1,
@@ -109,6 +112,7 @@ class TimestepCue(Resource):
                         config.phase = config.PHASE_START
                         config.performance = None
 
+                        config.guide_update.set()
                         # Wait until the behaviour tree has executed for the session goal and the user/system has chosen a shot (exercise in general) which has been confirmed.
                         while config.completed == config.COMPLETED_STATUS_UNDEFINED or config.shot is None or not config.shot_confirmed:
                             pass
@@ -146,6 +150,7 @@ class TimestepCue(Resource):
                         config.completed = config.COMPLETED_STATUS_FALSE
                         config.shot_finished = True
 
+                        config.guide_update.set()
                         while config.completed == config.COMPLETED_STATUS_FALSE:
                             pass
 
@@ -186,6 +191,7 @@ class TimestepCue(Resource):
                                 config.double_set_count_feedback = 0
                                 config.double_set_count_start = 0
                                 config.expecting_double_set = True
+                        config.guide_update.set()
 
                         new_data = {
                             'goal_level': 2,
@@ -206,6 +212,7 @@ class TimestepCue(Resource):
                                 config.shot = content['shotType']
                                 config.hand = content['hand']
 
+                            config.guide_update.set()
                             # Wait for the behaviour tree to execute.
                             while config.completed == config.COMPLETED_STATUS_UNDEFINED:
                                 pass
@@ -335,6 +342,7 @@ class TimestepCue(Resource):
                         config.completed = config.COMPLETED_STATUS_UNDEFINED
                         config.stat_finished = True
 
+                        config.guide_update.set()
                         while config.completed == config.COMPLETED_STATUS_UNDEFINED:
                             pass
 
@@ -374,6 +382,7 @@ class TimestepCue(Resource):
                             logging.debug("Setting config.performance to None.")
                             config.performance = None
 
+                        config.guide_update.set()
                         while config.completed != config.COMPLETED_STATUS_FALSE:
                             pass
 
@@ -439,6 +448,7 @@ class TimestepCue(Resource):
                         config.completed = config.COMPLETED_STATUS_UNDEFINED
                         config.set_finished = True
 
+                        config.guide_update.set()
                         while config.completed == config.COMPLETED_STATUS_UNDEFINED:
                             pass
 
@@ -473,6 +483,7 @@ class TimestepCue(Resource):
                         config.completed = config.COMPLETED_STATUS_UNDEFINED
 
                         logging.debug("Waiting")
+                        config.guide_update.set()
                         while config.completed != config.COMPLETED_STATUS_FALSE:
                             pass
 
@@ -518,6 +529,7 @@ class TimestepCue(Resource):
                             config.performance = performanceValue            # Not perfect because we might have the same performance for set and action.
                         config.goal_level = config.ACTION_GOAL
                         config.shot_count += 1
+                        config.guide_update.set()
 
                         # Send a signal to the screen API asking it to update the robot's screen with the new rep number
                         requestURL = config.screen_post_address + str(config.shot_count) + "/newRep"
@@ -609,6 +621,7 @@ class TimestepCue(Resource):
                 config.sessions = int(args['sessions'])
                 config.ability = int(args['ability'])
 
+                config.guide_update.set()
                 while config.completed == config.COMPLETED_STATUS_UNDEFINED:
                     pass
 
@@ -620,6 +633,7 @@ class TimestepCue(Resource):
                 config.goal_level = config.SESSION_GOAL
                 config.performance = int(args['performance'])
 
+                config.guide_update.set()
                 while config.completed == config.COMPLETED_STATUS_UNDEFINED:
                     pass
 
@@ -638,6 +652,7 @@ class TimestepCue(Resource):
                 config.goal_level = config.EXERCISE_GOAL
                 config.performance = int(args['performance'])
 
+                config.guide_update.set()
                 while config.completed == config.COMPLETED_STATUS_UNDEFINED:
                     pass
 
@@ -13152,6 +13152,13 @@ squash_behaviour_library = {
                     3: 'preinstruction_firstname_baseline_start_pre_3'}
 }
 
+# Behaviours whose demonstration shows the incorrect version of the shot/stat.
+_NEGATIVE_MODELING_BEHAVIOURS = frozenset([
+    config.A_NEGATIVEMODELING, config.A_PREINSTRUCTION_NEGATIVEMODELING,
+    config.A_POSTINSTRUCTIONPOSITIVE_NEGATIVE_MODELING, config.A_POSTINSTRUCTIONNEGATIVE_NEGATIVEMODELING,
+    config.A_QUESTIONING_NEGATIVEMODELING, config.A_NEGATIVEMODELING_POSTINSTRUCTIONNEGATIVE,
+    config.A_CONCURRENTINSTRUCTIONNEGATIVE_NEGATIVEMODELING])
+
 
 @dataclass
 class BehaviourLibraryFunctions:
@@ -13197,7 +13204,7 @@ class BehaviourLibraryFunctions:
         if phase is None:
             logging.debug("Setting phase to -1")
             phase = -1
-        logging.debug("behaviour = " + str(behaviour) + ", goal_level = " + str(goal_level) + ", performance = " + str(performance) + ", phase = " + str(phase))
+        logging.debug("behaviour = %s, goal_level = %s, performance = %s, phase = %s", behaviour, goal_level, performance, phase)
         if behaviour > 68 or behaviour < 1 or goal_level > 6 or goal_level < 0 or performance > 7 or performance < -1 or phase > 1 or phase < -1:
             msg = "Error: I don't know how to perform that behaviour."
         else:
@@ -13220,7 +13227,7 @@ class BehaviourLibraryFunctions:
         return msg
 
     def _get_pre_utterance(self, goal_level, behaviour, user_name, phase, hand, shot, stat, performance, final_set, second_set, utterance_choice, score, target):
-        logging.debug("Performance = " + str(performance))
+        logging.debug("Performance = %s", performance)
         utterance = ""
         name = ""
         hand_utterance = "forehand"
@@ -15969,11 +15976,7 @@ class BehaviourLibraryFunctions:
         if score is None or target is None or score == -1 or target == -1:
             return None
         posNeg = "_pos"
-        if behaviour in [config.A_NEGATIVEMODELING, config.A_PREINSTRUCTION_NEGATIVEMODELING,
-                         config.A_POSTINSTRUCTIONPOSITIVE_NEGATIVE_MODELING,
-                         config.A_POSTINSTRUCTIONNEGATIVE_NEGATIVEMODELING, config.A_QUESTIONING_NEGATIVEMODELING,
-                         config.A_NEGATIVEMODELING_POSTINSTRUCTIONNEGATIVE,
-                         config.A_CONCURRENTINSTRUCTIONNEGATIVE_NEGATIVEMODELING]:
+        if behaviour in _NEGATIVE_MODELING_BEHAVIOURS:
             posNeg = "_neg"
 
         vid = ""
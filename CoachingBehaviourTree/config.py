@@ -1,3 +1,7 @@
+import os
+import threading
+from collections import Counter
+
 SHOT_CHOICE = 0
 STAT_CHOICE = 1
 
@@ -5,6 +9,7 @@ CHOICE_BY_PERSON = 0
 CHOICE_BY_SYSTEM = 1
 
 MAX_SESSION_TIME = 1680  # 1800 seconds is 30 minutes so set to 2 minutes left to give time for tidying up.
+GUIDE_POLL_INTERVAL = 0.05  # Longest time (in seconds) to wait between ticks while TimestepCue waits for the guide.
 
 COMPLETED_STATUS_UNDEFINED = -1
 COMPLETED_STATUS_FALSE = 0
@@ -137,13 +142,17 @@ target = -1
 avg_score = -1
 performance = None
 completed = COMPLETED_STATUS_UNDEFINED
+# Set by the API whenever the guide sends new data, so the tree can sleep between ticks while TimestepCue is waiting
+# for it instead of spinning.
+guide_update = threading.Event()
+waiting_for_guide = False
 shot_count = 0
 action_score = -1
 prev_behav = -1
 matching_behav = 0
 phase = PHASE_START
 session_time = 0
-used_behaviours = []
+used_behaviours = Counter()  # How many times each behaviour has been displayed at the current goal level.
 set_performance_list = []  # 1 entry for each rep performed
 set_score_list = []  # 1 entry for each rep performed
 stat_performance_list = []  # 1 entry for each set performed for that stat
@@ -241,6 +250,12 @@ lambdaValue = 0.6
 epsilon = -1
 policy_matrix = None
 
+# Directory holding a sub-directory of history files for each participant. See TimestepCue.run for the layout. Can be
+# moved by setting the COACH_SESSION_DIR environment variable.
+session_data_path = os.path.expanduser(os.environ.get("COACH_SESSION_DIR",
+                                                      "~/PycharmProjects/coachingPolicies/SessionDataFiles")) + "/"
+os.makedirs(session_data_path, exist_ok=True)
+
 # Robot through Peppernet router\:
 # post_address = 'http://192.168.1.237:4999/output'
 
@@ -30,6 +30,12 @@ from Policy.coaching_env import CoachingEnvironment
 from Policy.policy import Policy
 from Policy.policy_wrapper import PolicyWrapper
 
+# Goal levels at which a repeated behaviour (or category) is replaced with pre-instruction.
+_NO_REPEAT_GOALS = frozenset([config.SESSION_GOAL, config.EXERCISE_GOAL, config.STAT_GOAL, config.SET_GOAL])
+_FINAL_STEP_NO_REPEAT_GOALS = frozenset([config.SESSION_GOAL, config.EXERCISE_GOAL, config.SET_GOAL])
+# Goal levels after whose feedback the adapted policy is logged.
+_POLICY_LOG_GOALS = frozenset([config.EXERCISE_GOAL, config.STAT_GOAL])
+
 
 def create_coaching_tree():
     """
@@ -1423,28 +1429,35 @@ def update(state, state2, reward, action, action2):
     logging.debug("Updating policy, state: " + str(state) + ", action: " + str(action))
     logging.debug("State2 = " + str(state2) + ", action2 = " + str(action2))
     logging.debug("Reward = " + str(reward))
+    # The matrix and traces are updated in place, so the same references stay current for the whole update.
+    policy = config.policy_matrix
+    matrix = policy.get_matrix()
+    traces = policy.get_eligibility_traces()
     # Expected reward:
-    predict = config.policy_matrix.get_matrix()[state][action]
-    # Next expected reward: config.policy_matrix.get_matrix()[state2][action2]
+    predict = matrix[state][action]
+    # Next expected reward: matrix[state2][action2]
     # TD:
-    target = reward + config.gamma * config.policy_matrix.get_matrix()[state2][action2]
+    target = reward + config.gamma * matrix[state2][action2]
     # TD error: target - predict
     td_error = target - predict
 
     # increment eligibility traces (state, action)
-    config.policy_matrix.update_eligibility_traces(state, action, config.policy_matrix.get_eligibility_traces()[state][action] + 1)
+    policy.update_eligibility_traces(state, action, traces[state][action] + 1)
 
+    step = config.alpha * td_error
+    decay = config.gamma * config.lambdaValue
     # For each state action pair:
-    for s in range(len(config.policy_matrix.get_matrix())):
+    for s, (row, trace_row) in enumerate(zip(matrix, traces)):
         # Only do it if >= 0.1 to save time.
-        if sum(config.policy_matrix.get_eligibility_traces()[s]) >= 0.001:
-            for a in range(len(config.policy_matrix.get_matrix()[s])):
-                if config.policy_matrix.get_eligibility_traces()[s][a] >= 0.001:
+        if sum(trace_row) >= 0.001:
+            for a, trace in enumerate(trace_row):
+                if trace >= 0.001:
                     # Update transition matrix:
-                    config.policy_matrix.update_matrix(s, a, 0.0 if config.policy_matrix.get_matrix()[s][a] + config.alpha * td_error * config.policy_matrix.get_eligibility_traces()[s][a] < 0.0 else config.policy_matrix.get_matrix()[s][a] + config.alpha * td_error * config.policy_matrix.get_eligibility_traces()[s][a])
+                    value = row[a] + step * trace
+                    policy.update_matrix(s, a, 0.0 if value < 0.0 else value)
                     # config.policy_matrix.get_matrix()[state][action] = config.policy_matrix.get_matrix()[state][action] + config.alpha * (target - predict) * eligibility_traces(state, action)
                     # Decay E(state, action)
-                    config.policy_matrix.update_eligibility_traces(s, a, config.gamma * config.lambdaValue * config.policy_matrix.get_eligibility_traces()[s][a])
+                    policy.update_eligibility_traces(s, a, decay * trace)
 
     # config.policy_matrix.update_matrix(state, action, 0.0 if config.policy_matrix.get_matrix()[state][action] + config.alpha * (target - predict) < 0.0 else config.policy_matrix.get_matrix()[state][action] + config.alpha * (target - predict))
     '''else:
@@ -1550,8 +1563,8 @@ def main():
     # else:
     #     logging.debug("The file does not exist")
 
-    if os.path.exists("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/Sessions.txt"):
-        sessionsFile = "/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/Sessions.txt"
+    if os.path.exists(config.session_data_path + config.participantNo + "/Sessions.txt"):
+        sessionsFile = config.session_data_path + config.participantNo + "/Sessions.txt"
         f = open(sessionsFile, 'r')
         file_contents = f.readlines()
         f.close()
@@ -1593,13 +1606,13 @@ def main():
 
         # If behaviour occurs twice, just skip to pre-instruction.
         logging.debug("used behaviours = " + str(config.used_behaviours) + ", config.getBehaviourGoalLevel = " + str(config.getBehaviourGoalLevel))
-        if (action2 in config.used_behaviours or threeTimesCategory(action2, config.used_behaviours)) and (
-                config.getBehaviourGoalLevel == config.SESSION_GOAL or config.getBehaviourGoalLevel == config.EXERCISE_GOAL or config.getBehaviourGoalLevel == config.STAT_GOAL or config.getBehaviourGoalLevel == config.SET_GOAL):
+        if (action2 in config.used_behaviours or threeTimesCategory(action2, config.used_behaviours.elements())) and \
+                config.getBehaviourGoalLevel in _NO_REPEAT_GOALS:
             action2 = config.A_PREINSTRUCTION
             logging.debug('Got new behaviour: 1')
             # config.matching_behav = 0
         else:
-            config.used_behaviours.append(action2)
+            config.used_behaviours[action2] += 1
 
         '''if config.goal_level == config.SET_GOAL or config.goal_level == config.ACTION_GOAL or config.goal_level == config.BASELINE_GOAL:
             config.set_level_behaviours.append([state1, action1, state2, action2])
@@ -1624,7 +1637,7 @@ def main():
         if reward is not None:
             update(state1, state2, reward, action1, action2)
 
-        if (config.goal_level == config.EXERCISE_GOAL or config.goal_level == config.STAT_GOAL) and config.phase == config.PHASE_END:
+        if config.goal_level in _POLICY_LOG_GOALS and config.phase == config.PHASE_END:
             logging.info("Policy = " + str(config.policy_matrix.get_matrix()))
             logging.info("Cumulative reward = " + str(config.cumulative_reward))
         #
@@ -1649,13 +1662,12 @@ def main():
     # If behaviour occurs twice, just skip to pre-instruction.
     logging.debug(
         "used behaviours = " + str(config.used_behaviours) + ", goal_level = " + str(config.getBehaviourGoalLevel))
-    if action2 in config.used_behaviours and (
-            config.getBehaviourGoalLevel == config.SESSION_GOAL or config.getBehaviourGoalLevel == config.EXERCISE_GOAL or config.getBehaviourGoalLevel == config.SET_GOAL):
+    if action2 in config.used_behaviours and config.getBehaviourGoalLevel in _FINAL_STEP_NO_REPEAT_GOALS:
         action2 = config.A_PREINSTRUCTION
         logging.debug('Got new behaviour: 1')
         # config.matching_behav = 0
     else:
-        config.used_behaviours.append(action2)
+        config.used_behaviours[action2] += 1
 
     # Learning the Q-value
     # if reward is not None:
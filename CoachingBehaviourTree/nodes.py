@@ -30,16 +30,28 @@ EndSetEvent(Node)
 """
 import logging
 import os
-from statistics import mean, mode
-import time
+from statistics import mode
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 from node import Node
 from tree import NodeStatus
 from multiprocessing import Process, Queue, Pipe
 
-from API import api_classes
-from CoachingBehaviourTree import controller, config
+from CoachingBehaviourTree import config
+# Behaviour ids never change at runtime, so bind them directly rather than looking them up on config each time.
+from CoachingBehaviourTree.config import (
+    A_CONCURRENTINSTRUCTIONNEGATIVE_NEGATIVEMODELING, A_CONCURRENTINSTRUCTIONPOSITIVE_POSITIVEMODELING, A_END,
+    A_HUSTLE, A_MANUALMANIPULATION_POSITIVEMODELING, A_MANUALMANIPULATION_PREINSTRUCTION,
+    A_MANUALMANIPULATION_QUESTIONING, A_NEGATIVEMODELING, A_NEGATIVEMODELING_POSTINSTRUCTIONNEGATIVE,
+    A_POSITIVEMODELING, A_POSITIVEMODELING_CONCURRENTINSTRUCTIONPOSITIVE, A_POSITIVEMODELING_HUSTLE,
+    A_POSITIVEMODELING_POSTINSTRUCTIONPOSITIVE, A_POSITIVEMODELING_PRAISE, A_POSITIVEMODELING_PREINSTRUCTION,
+    A_POSITIVEMODELING_QUESTIONING, A_POSTINSTRUCTIONNEGATIVE_NEGATIVEMODELING,
+    A_POSTINSTRUCTIONNEGATIVE_POSITIVEMODELING, A_POSTINSTRUCTIONPOSITIVE_NEGATIVE_MODELING,
+    A_POSTINSTRUCTIONPOSITIVE_POSITIVE_MODELING, A_PREINSTRUCTION, A_PREINSTRUCTION_FIRSTNAME,
+    A_PREINSTRUCTION_MANUALMANIPULATION, A_PREINSTRUCTION_NEGATIVEMODELING, A_PREINSTRUCTION_POSITIVEMODELING,
+    A_PREINSTRUCTION_PRAISE, A_PREINSTRUCTION_QUESTIONING, A_QUESTIONING, A_QUESTIONING_FIRSTNAME,
+    A_QUESTIONING_NEGATIVEMODELING, A_QUESTIONING_POSITIVEMODELING, A_SCOLD_POSITIVEMODELING, A_SILENCE)
 from CoachingBehaviourTree.action import Action
 from CoachingBehaviourTree.behaviour_library import BehaviourLibraryFunctions, squash_behaviour_library
 from Policy.policy import Policy
@@ -47,6 +59,7 @@ from Policy.policy_wrapper import PolicyWrapper
 import numpy as np
 import random
 import requests
+from requests.adapters import HTTPAdapter
 import operator
 
 '''# Robot through Peppernet router:
@@ -66,23 +79,140 @@ screen_post_address = "http://192.168.1.207:8000/"
 behaviour = -1
 need_new_behaviour = False'''
 
+# Keep-alive HTTP sessions for Pepper and its tablet so each post does not open a new connection. Screen updates do not
+# need a response, so they are sent in order from a single background thread instead of blocking the tree tick.
+_session = requests.Session()
+_screen_session = requests.Session()
+# Everything goes to a single host each, so one pooled connection per session is enough.
+_session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+_screen_session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+_screen_executor = ThreadPoolExecutor(max_workers=1)
+
+# Fixed payloads sent to Pepper, built once rather than on every post.
+_SILENCE_OUTPUT = {"silence": "True"}
+_STOP_OUTPUT = {"stop": "1"}
+
+
+def _send_screen_post(url):
+    try:
+        _screen_session.post(url)
+    except requests.exceptions.RequestException:
+        logging.exception("Could not update Pepper's screen: %s", url)
+
+
+def _post_to_screen(url):
+    """
+    Queue a post request to Pepper's tablet without waiting for the response.
+    :param url :type str: the full screen API address, including the path describing what to display.
+    :return: None
+    """
+    _screen_executor.submit(_send_screen_post, url)
+
+
+# Participant history files are only written by the tree during a session, so their lines are kept in memory after the
+# first read. Updates are written back with a single buffered write rather than re-reading the whole file first. Writes
+# stay synchronous because other modules (e.g. CoachingEnvironment.reset) read these files straight from disk.
+_history_cache = {}
+
+
+def _read_history(path):
+    """
+    Get the lines of a participant history file, only going to disk the first time the file is read.
+    :param path :type str: the full path of the history file.
+    :return: a list of the lines in the file which the caller is free to modify.
+    """
+    lines = _history_cache.get(path)
+    if lines is None:
+        with open(path, "r") as f:
+            lines = f.readlines()
+        _history_cache[path] = lines
+    return list(lines)
+
+
+def _write_history(path, lines):
+    """
+    Overwrite a participant history file with the given lines and keep them as the cached contents of the file.
+    :param path :type str: the full path of the history file.
+    :param lines :type list[str]: the new contents of the file, one entry per line.
+    :return: None
+    """
+    with open(path, "w", buffering=1 << 16) as f:
+        f.writelines(lines)
+    _history_cache[path] = list(lines)
+
+
+def _append_history(path, lines):
+    """
+    Append to a participant history file (creating it if needed) with a single write, keeping any cached copy in step.
+    :param path :type str: the full path of the history file.
+    :param lines :type list[str]: the lines to add to the end of the file.
+    :return: None
+    """
+    with open(path, "a") as f:
+        f.write("".join(lines))
+    cached = _history_cache.get(path)
+    if cached is not None:
+        if not cached or cached[-1].endswith("\n"):
+            cached.extend(lines)
+        else:
+            # The new text joins onto the unterminated last line, so let the next read split it again.
+            del _history_cache[path]
+
+
+# Goal levels which always move the parent goal into its feedback phase when they end. A set only does so once all
+# sets for the stat are complete.
+_FEEDBACK_ON_END_GOALS = frozenset([config.SESSION_GOAL, config.EXERCISE_GOAL, config.STAT_GOAL])
+
+# Goal levels grouped by how FormatAction phrases questions and scores for them.
+_SHOT_LEVEL_GOALS = frozenset([config.SESSION_GOAL, config.EXERCISE_GOAL])
+_EXERCISE_AND_STAT_GOALS = frozenset([config.EXERCISE_GOAL, config.STAT_GOAL])
+# Behaviours which are never displayed on their own outside of an action goal, so a new one is requested instead.
+_NON_ACTION_SKIPPED_BEHAVIOURS = frozenset([A_HUSTLE, A_SILENCE])
+
+# Behaviours which count as an example of pre-instruction or questioning when checking the policy's output.
+_PREINSTRUCTION_BEHAVIOURS = frozenset([
+    A_PREINSTRUCTION, A_PREINSTRUCTION_PRAISE, A_PREINSTRUCTION_QUESTIONING,
+    A_PREINSTRUCTION_POSITIVEMODELING, A_POSITIVEMODELING_PREINSTRUCTION,
+    A_PREINSTRUCTION_FIRSTNAME, A_PREINSTRUCTION_MANUALMANIPULATION,
+    A_PREINSTRUCTION_NEGATIVEMODELING, A_MANUALMANIPULATION_PREINSTRUCTION])
+_QUESTIONING_BEHAVIOURS = frozenset([
+    A_QUESTIONING, A_QUESTIONING_FIRSTNAME, A_QUESTIONING_POSITIVEMODELING,
+    A_POSITIVEMODELING_QUESTIONING, A_MANUALMANIPULATION_QUESTIONING,
+    A_QUESTIONING_NEGATIVEMODELING])
+# Pre-instruction behaviours (without manual manipulation) which use the config scores at the start of an exercise.
+_EXERCISE_PREINSTRUCTION_BEHAVIOURS = frozenset([
+    A_PREINSTRUCTION, A_PREINSTRUCTION_FIRSTNAME, A_PREINSTRUCTION_POSITIVEMODELING,
+    A_POSITIVEMODELING_PREINSTRUCTION, A_PREINSTRUCTION_QUESTIONING, A_PREINSTRUCTION_PRAISE,
+    A_PREINSTRUCTION_NEGATIVEMODELING])
+# Behaviours which ask the user a question on the screen.
+_QUESTION_PROMPT_BEHAVIOURS = frozenset([
+    A_QUESTIONING, A_QUESTIONING_FIRSTNAME, A_QUESTIONING_POSITIVEMODELING,
+    A_POSITIVEMODELING_QUESTIONING, A_QUESTIONING_NEGATIVEMODELING])
+# Behaviours which include a positive or negative demonstration of the shot.
+_DEMO_BEHAVIOURS = frozenset([
+    A_POSITIVEMODELING, A_NEGATIVEMODELING, A_PREINSTRUCTION_POSITIVEMODELING,
+    A_PREINSTRUCTION_NEGATIVEMODELING, A_POSTINSTRUCTIONPOSITIVE_POSITIVE_MODELING,
+    A_POSTINSTRUCTIONPOSITIVE_NEGATIVE_MODELING, A_POSTINSTRUCTIONNEGATIVE_POSITIVEMODELING,
+    A_POSTINSTRUCTIONNEGATIVE_NEGATIVEMODELING, A_QUESTIONING_NEGATIVEMODELING,
+    A_POSITIVEMODELING_POSTINSTRUCTIONPOSITIVE, A_NEGATIVEMODELING_POSTINSTRUCTIONNEGATIVE,
+    A_POSITIVEMODELING_PREINSTRUCTION, A_SCOLD_POSITIVEMODELING,
+    A_CONCURRENTINSTRUCTIONPOSITIVE_POSITIVEMODELING, A_CONCURRENTINSTRUCTIONNEGATIVE_NEGATIVEMODELING,
+    A_MANUALMANIPULATION_POSITIVEMODELING, A_QUESTIONING_POSITIVEMODELING,
+    A_POSITIVEMODELING_CONCURRENTINSTRUCTIONPOSITIVE, A_POSITIVEMODELING_QUESTIONING,
+    A_POSITIVEMODELING_HUSTLE, A_POSITIVEMODELING_PRAISE])
+
+# Start state of the interaction for each of the 12 coaching styles, indexed by style.
+_STYLE_START_STATES = (0, 45, 90, 135, 180, 225, 270, 323, 376, 429, 482, 535)
+
+
 class GetBehaviour(Node):
     """
     Query the policy wrapper for the next behaviour to confirm given the current state of the interaction.
     ...
     Attributes
     ----------
-    belief :type list[float]
-        Belief distribution over all 12 policies (based on data from semi-structured interviews with coaches and
-        physios).
-    state :type int
-        Previous state based on observation from policy.
     goal_level :type int
         Which level of goal we are currently in (e.g. SET_GOAL).
-    performance :type int
-        Which level of performance the player achieved in their last action/set/shot etc (e.g. MET).
-    phase :type int
-        Whether in the intro or feedback sequences (PHASE_START or PHASE_END).
 
     Methods
     -------
@@ -109,20 +239,11 @@ class GetBehaviour(Node):
             state information.
         :return: None
         """
-        logging.debug("Configuring GetBehaviour: " + self._name)
-        logging.debug("Configuring GetBehaviour: " + self._name)
+        logging.debug("Configuring GetBehaviour: %s", self._name)
         # logging.debug(str(nodedata))
-        self.belief = nodedata.get_data('belief')            # Belief distribution over policies.
-        self.goal_level = nodedata.get_data('goal')          # Which level of goal we are currently in (e.g. SET_GOAL)
-        self.performance = nodedata.get_data('performance')  # Which level of performance the player achieved (e.g. MET)
-        self.phase = nodedata.get_data('phase')              # PHASE_START or PHASE_END
-        self.previous_phase = nodedata.get_data('previous_phase', config.PHASE_START)  # PHASE_START or PHASE_END
-        self.state = config.observation # Have to set observation as global variable in controller because when we're in the while loop, the pre-behav-node will be different the first time to the subsequent times.
-        self.need_score = nodedata.get_data('need_score', False)
-        '''if self.previous_phase == config.PHASE_START:
-            self.state = nodedata.get_data('state')  # Previous state based on observation.
-        else:
-            self.state = nodedata.get_data('feedback_state')'''
+        # The belief, state, performance and phase are only needed by the policy, which the controller queries
+        # directly (see config.policy_matrix), so the goal level is the only value read from the blackboard here.
+        self.goal_level = nodedata.get_data('goal')  # Which level of goal we are currently in (e.g. SET_GOAL)
 
     def run(self, nodedata):
         """
@@ -133,17 +254,17 @@ class GetBehaviour(Node):
         """
         if not config.stop_set and not config.stop_session and not config.stop_session_on_baseline:
             # logging.debug('GetBehaviour, self.goal_level = ' + str(self.goal_level) + ', nodedata.goal = ' + str(nodedata.goal))
-            # policy = PolicyWrapper(self.belief)  # TODO: generate this at start of interaction and store on blackboard.
-            #, nodedata.obs_behaviour
-            # nodedata.behaviour = policy.get_behaviour(self.state, self.goal_level, self.performance, self.phase)
-            if config.behaviour_displayed or ((config.behaviour == config.A_HUSTLE or config.behaviour == config.A_SILENCE) and not self.goal_level == config.ACTION_GOAL):  # If we need a new behaviour, return active so that control as passed back to controller to generate new behaviour from policy.
+            # The policy wrapper is created once per session in CoachingEnvironment.reset() and kept in
+            # config.policy_matrix, where the controller queries it for config.behaviour. Never build one per tick.
+            behaviour = config.behaviour
+            if config.behaviour_displayed or (behaviour in _NON_ACTION_SKIPPED_BEHAVIOURS and not self.goal_level == config.ACTION_GOAL):  # If we need a new behaviour, return active so that control as passed back to controller to generate new behaviour from policy.
                 config.need_new_behaviour = True
-                logging.debug("Returning ACTIVE from GetBehaviour, nodedata = " + str(nodedata))
+                logging.debug("Returning ACTIVE from GetBehaviour, nodedata = %s", nodedata)
                 return NodeStatus(NodeStatus.ACTIVE, "Need new behaviour")
             else:
                 # config.need_new_behaviour = True
-                nodedata.behaviour = config.behaviour
-                logging.info('GetBehaviour Got behaviour: ' + str(config.behaviour))
+                nodedata.behaviour = behaviour
+                logging.info("GetBehaviour Got behaviour: %s", behaviour)
 
                 # If behaviour occurs twice, just skip to pre-instruction.
                 """if nodedata.behaviour in config.used_behaviours and (self.goal_level == config.SESSION_GOAL or self.goal_level == config.EXERCISE_GOAL or self.goal_level == config.SET_GOAL):
@@ -151,18 +272,17 @@ class GetBehaviour(Node):
                     logging.debug('Got new behaviour: 1')
                     # config.matching_behav = 0
                 else:
-                    config.used_behaviours.append(nodedata.behaviour)
+                    config.used_behaviours[nodedata.behaviour] += 1
         
                 config.prev_behav = nodedata.behaviour
         
-                config.observation = policy.get_observation(self.state, nodedata.behaviour)"""
+                config.observation = config.policy_matrix.get_observation(self.state, nodedata.behaviour)"""
                 ''' logging.debug("self.need_score = " + str(self.need_score) + ", config.scores_provided = " + str(config.scores_provided) + ", config.has_score_been_provided = " + str(config.has_score_been_provided))
                 if self.need_score and not config.scores_provided < 1:
                     config.has_score_been_provided = False
                     logging.debug("set has_score_been_provided to False")'''
                 # logging.debug('Got observation: ' + str(nodedata.behaviour))
-                logging.debug("Returning SUCCESS from GetBehaviour, nodedata = " + str(nodedata))
-                logging.debug("Returning SUCCESS from GetBehaviour, nodedata = " + str(nodedata))
+                logging.debug("Returning SUCCESS from GetBehaviour, nodedata = %s", nodedata)
                 return NodeStatus(NodeStatus.SUCCESS, "Obtained behaviour " + str(nodedata.behaviour))
         else:
             if config.stop_session_on_baseline:
@@ -225,17 +345,18 @@ class FormatAction(Node):
         """
         # logging.debug("Configuring FormatAction: " + self._name + ". PHASE = " + str(nodedata.get_data('phase')) + ". performance = " + str(nodedata.get_data('performance')) + ". config.performance = " + str(config.performance) + ". shot = " + str(nodedata.get_data('shot')))
         # logging.debug("FormatAction nodedata: " + str(nodedata))
-        self.goal_level = nodedata.get_data('goal')          # Which level of goal we are currently in (e.g. SET_GOAL)
-        self.performance = nodedata.get_data('performance', config.performance)  # Which level of performance the player achieved (e.g. MET)
-        self.phase = nodedata.get_data('phase')              # PHASE_START or PHASE_END
-        self.score = nodedata.get_data('score')              # Numerical score from sensor relating to a stat (can be None)
-        self.target = nodedata.get_data('target')            # Numerical target score for stat (can be None)
-        self.behaviour_lib = nodedata.get_data('bl')         # The behaviour library to be used in generating actions
-        self.behaviour = nodedata.get_data('behaviour')      # The type of behaviour to create an action for.
-        self.name = config.name                          # The name of the current user.
-        self.shot = nodedata.get_data('shot', config.shot)   # The shot type (can be None)
-        self.hand = nodedata.get_data('hand', config.hand)   # Forehand or backhand associated with shot (can be None)
-        self.stat = nodedata.get_data('stat', config.stat)   # The stat type (can be None)
+        get_data = nodedata.get_data
+        self.goal_level = get_data('goal')          # Which level of goal we are currently in (e.g. SET_GOAL)
+        self.performance = get_data('performance', config.performance)  # Which level of performance the player achieved (e.g. MET)
+        self.phase = get_data('phase')              # PHASE_START or PHASE_END
+        self.score = get_data('score')              # Numerical score from sensor relating to a stat (can be None)
+        self.target = get_data('target')            # Numerical target score for stat (can be None)
+        self.behaviour_lib = get_data('bl')         # The behaviour library to be used in generating actions
+        self.behaviour = get_data('behaviour')      # The type of behaviour to create an action for.
+        self.name = config.name                 # The name of the current user.
+        self.shot = get_data('shot', config.shot)   # The shot type (can be None)
+        self.hand = get_data('hand', config.hand)   # Forehand or backhand associated with shot (can be None)
+        self.stat = get_data('stat', config.stat)   # The stat type (can be None)
         # logging.debug("Configuring FormatAction: " + self._name + ". PHASE = " + str(nodedata.get_data('phase')) + ". performance = " + str(nodedata.get_data('performance')) + ". config.performance = " + str(config.performance) + ". shot = " + str(nodedata.get_data('shot')) + ". stat = " + str(nodedata.get_data('stat') + ", " + str(self.stat)))
 
     def run(self, nodedata):
@@ -246,49 +367,26 @@ class FormatAction(Node):
         :return: NodeStatus.SUCCESS when an action has been created.
         """
         if not config.stop_set and not config.stop_session:
-            logging.info("Formatting action: behaviour = {behaviour}, goal_level = {goal_level}, performance = {performance}, score = {score}, target = {target}, name = {name}, shot = {shot}, hand = {hand}, stat = {stat}".format(behaviour=self.behaviour, goal_level=self.goal_level, performance=self.performance, score=self.score, target=self.target, name=self.name, shot=config.shot, hand=config.hand, stat=config.stat))
+            logging.info("Formatting action: behaviour = %s, goal_level = %s, performance = %s, score = %s, target = %s, name = %s, shot = %s, hand = %s, stat = %s", self.behaviour, self.goal_level, self.performance, self.score, self.target, self.name, config.shot, config.hand, config.stat)
             # logging.info("Formatting action: behaviour = {behaviour}, goal_level = {goal_level}, performance = {performance}, name = {name}, exercise = {exercise}".format(behaviour=self.behaviour, goal_level=self.goal_level, performance=self.performance, name=self.name, exercise=config.shot))
-            if not(self.behaviour == config.A_SILENCE):
+            if not(self.behaviour == A_SILENCE):
                 if (self.goal_level == config.SESSION_GOAL or (self.goal_level == config.EXERCISE_GOAL and config.phase == config.PHASE_END and config.stat_count >= config.STATS_PER_SHOT)) and config.end_session_stat is not None:
                     self.stat = config.end_session_stat
                     config.stat = config.end_session_stat
                 demo = None
-                if self.behaviour in [config.A_POSITIVEMODELING, config.A_NEGATIVEMODELING,
-                                      config.A_PREINSTRUCTION_POSITIVEMODELING, config.A_PREINSTRUCTION_NEGATIVEMODELING,
-                                      config.A_POSTINSTRUCTIONPOSITIVE_POSITIVE_MODELING,
-                                      config.A_POSTINSTRUCTIONPOSITIVE_NEGATIVE_MODELING,
-                                      config.A_POSTINSTRUCTIONNEGATIVE_POSITIVEMODELING,
-                                      config.A_POSTINSTRUCTIONNEGATIVE_NEGATIVEMODELING,
-                                      config.A_QUESTIONING_NEGATIVEMODELING,
-                                      config.A_POSITIVEMODELING_POSTINSTRUCTIONPOSITIVE,
-                                      config.A_NEGATIVEMODELING_POSTINSTRUCTIONNEGATIVE,
-                                      config.A_POSITIVEMODELING_PREINSTRUCTION, config.A_SCOLD_POSITIVEMODELING,
-                                      config.A_CONCURRENTINSTRUCTIONPOSITIVE_POSITIVEMODELING,
-                                      config.A_CONCURRENTINSTRUCTIONNEGATIVE_NEGATIVEMODELING,
-                                      config.A_MANUALMANIPULATION_POSITIVEMODELING, config.A_QUESTIONING_POSITIVEMODELING,
-                                      config.A_POSITIVEMODELING_CONCURRENTINSTRUCTIONPOSITIVE,
-                                      config.A_POSITIVEMODELING_QUESTIONING, config.A_POSITIVEMODELING_HUSTLE,
-                                      config.A_POSITIVEMODELING_PRAISE]:
-                    if ((self.goal_level == config.EXERCISE_GOAL and self.behaviour in [config.A_PREINSTRUCTION,
-                                                                                        config.A_PREINSTRUCTION_FIRSTNAME,
-                                                                                        config.A_PREINSTRUCTION_POSITIVEMODELING,
-                                                                                        config.A_POSITIVEMODELING_PREINSTRUCTION,
-                                                                                        config.A_PREINSTRUCTION_QUESTIONING,
-                                                                                        config.A_PREINSTRUCTION_PRAISE,
-                                                                                        config.A_PREINSTRUCTION_NEGATIVEMODELING]) or self.goal_level == config.STAT_GOAL) and self.phase == config.PHASE_START:
+                if self.behaviour in _DEMO_BEHAVIOURS:
+                    if ((self.goal_level == config.EXERCISE_GOAL and self.behaviour in _EXERCISE_PREINSTRUCTION_BEHAVIOURS) or self.goal_level == config.STAT_GOAL) and self.phase == config.PHASE_START:
                         demo = self.behaviour_lib.get_demo_string(self.behaviour, self.goal_level, config.shot, config.hand, config.stat, config.leftHand, config.score, config.target)
                     else:
                         demo = self.behaviour_lib.get_demo_string(self.behaviour, self.goal_level, config.shot,
                                                                   config.hand, config.stat, config.leftHand, self.score, self.target)
-                    logging.info("Demo = " + str(demo))
+                    logging.info("Demo = %s", demo)
                 question = None
-                if self.behaviour in [config.A_QUESTIONING, config.A_QUESTIONING_FIRSTNAME,
-                                      config.A_QUESTIONING_POSITIVEMODELING,
-                                      config.A_POSITIVEMODELING_QUESTIONING, config.A_QUESTIONING_NEGATIVEMODELING]:
+                if self.behaviour in _QUESTION_PROMPT_BEHAVIOURS:
                     if config.overrideQuestioningOption:
                         question = "Concurrent"
                     else:
-                        if not (self.goal_level == config.SESSION_GOAL or self.goal_level == config.EXERCISE_GOAL):
+                        if self.goal_level not in _SHOT_LEVEL_GOALS:
                             if self.goal_level == config.ACTION_GOAL:
                                 question = "Concurrent"
                             else:
@@ -307,22 +405,13 @@ class FormatAction(Node):
                         config.feedback_question = False
 
                 # If this is the start of a new exercise set, we need to reset the counter on Pepper's screen.
-                if self.behaviour in [config.A_PREINSTRUCTION_POSITIVEMODELING, config.A_PREINSTRUCTION,
-                                      config.A_POSITIVEMODELING_PREINSTRUCTION, config.A_PREINSTRUCTION_PRAISE,
-                                      config.A_PREINSTRUCTION_NEGATIVEMODELING,
-                                      config.A_PREINSTRUCTION_QUESTIONING,
-                                      config.A_PREINSTRUCTION_MANUALMANIPULATION,
-                                      config.A_PREINSTRUCTION_FIRSTNAME,
-                                      config.A_MANUALMANIPULATION_PREINSTRUCTION] and self.goal_level == config.SET_GOAL:
-                    r = requests.post(config.screen_post_address + "0/newRep")
+                if self.behaviour in _PREINSTRUCTION_BEHAVIOURS and self.goal_level == config.SET_GOAL:
+                    _post_to_screen(config.screen_post_address + "0/newRep")
                 if self.performance is None:
                     self.performance = -1
                 if self.behaviour is not None:
-                    if ((self.goal_level == config.EXERCISE_GOAL and self.behaviour in [config.A_PREINSTRUCTION, config.A_PREINSTRUCTION_FIRSTNAME,
-                                                      config.A_PREINSTRUCTION_POSITIVEMODELING, config.A_POSITIVEMODELING_PREINSTRUCTION,
-                                                      config.A_PREINSTRUCTION_QUESTIONING, config.A_PREINSTRUCTION_PRAISE,
-                                                      config.A_PREINSTRUCTION_NEGATIVEMODELING]) or self.goal_level == config.STAT_GOAL) and self.phase == config.PHASE_START:
-                        logging.debug("Using config scores to generate utterance. goal_level = " + str(self.goal_level) + ", behaviour = " + str(self.behaviour) + ", phase = " + str(self.phase) + ", score = " + str(config.score) + ", target = " + str(config.target))
+                    if ((self.goal_level == config.EXERCISE_GOAL and self.behaviour in _EXERCISE_PREINSTRUCTION_BEHAVIOURS) or self.goal_level == config.STAT_GOAL) and self.phase == config.PHASE_START:
+                        logging.debug("Using config scores to generate utterance. goal_level = %s, behaviour = %s, phase = %s, score = %s, target = %s", self.goal_level, self.behaviour, self.phase, config.score, config.target)
                         pre_msg = self.behaviour_lib.get_pre_msg(self.behaviour, self.goal_level, self.performance,
                                                                  self.phase, self.name, config.shot, config.hand,
                                                                  config.stat,
@@ -333,13 +422,13 @@ class FormatAction(Node):
                         pre_msg = self.behaviour_lib.get_pre_msg(self.behaviour, self.goal_level, self.performance, self.phase, self.name, config.shot, config.hand, config.stat, config.shot_count == 3 and config.set_count == config.SETS_PER_STAT, not config.set_count == 0 and not config.set_count == config.SETS_PER_STAT, self.score, self.target)
                 else:
                     pre_msg = ""
-                if self.score is None and ((config.score is None or config.score == -1) and (self.goal_level == config.EXERCISE_GOAL or self.goal_level == config.STAT_GOAL)) or config.has_score_been_provided:  # or config.given_score >= 2:
+                if self.score is None and ((config.score is None or config.score == -1) and self.goal_level in _EXERCISE_AND_STAT_GOALS) or config.has_score_been_provided:  # or config.given_score >= 2:
                     logging.debug("Formatting action, no score")
                     nodedata.action = Action(pre_msg, demo=demo, question=question)
                 else:
                     logging.debug("Formatting action, got score")
-                    logging.debug("ACTION, self.score = " + str(self.score))
-                    logging.debug("ACTION, self.target = " + str(self.target))
+                    logging.debug("ACTION, self.score = %s", self.score)
+                    logging.debug("ACTION, self.target = %s", self.target)
                     if config.stat == "racketPreparation" or config.stat == "approachTiming":
                         stat_measure = "%"
                         if config.stat == "racketPreparation":
@@ -359,7 +448,7 @@ class FormatAction(Node):
                         stat_measure = " seconds"
                         stat_explanation = "This is a measure of how long it takes between hitting the ball and your swing stopping."
                     if self.goal_level == config.EXERCISE_GOAL and self.phase == config.PHASE_END:
-                        logging.debug("stat count = " + str(config.stat_count))
+                        logging.debug("stat count = %s", config.stat_count)
                         if config.stat_count < config.STATS_PER_SHOT:
                             nodedata.action = Action(pre_msg, demo=demo, question=question)
                         else:
@@ -386,7 +475,7 @@ class FormatAction(Node):
                                                              goal=self.goal_level, stat_measure=stat_measure,
                                                              ending=True)
                                 else:
-                                    logging.debug("self.goal_level != config.EXERCISE_GOAL or self.phase != config.PHASE_START, self.goal_level = " + str(self.goal_level) + ", phase = " + str(self.phase))
+                                    logging.debug("self.goal_level != config.EXERCISE_GOAL or self.phase != config.PHASE_START, self.goal_level = %s, phase = %s", self.goal_level, self.phase)
                                     nodedata.action = Action(pre_msg, self.score, self.target, demo=demo, question=question,
                                                          goal=self.goal_level, stat_measure=stat_measure)
                             '''has_score_been_provided=config.has_score_been_provided,'''
@@ -395,10 +484,7 @@ class FormatAction(Node):
                             logging.debug("Not given stat explanation")
                             if self.goal_level == config.SET_GOAL:
                                 logging.debug("SET_GOAL")
-                                if self.behaviour in [config.A_PREINSTRUCTION, config.A_PREINSTRUCTION_FIRSTNAME,
-                                                      config.A_PREINSTRUCTION_POSITIVEMODELING, config.A_POSITIVEMODELING_PREINSTRUCTION,
-                                                      config.A_PREINSTRUCTION_QUESTIONING, config.A_PREINSTRUCTION_PRAISE,
-                                                      config.A_PREINSTRUCTION_NEGATIVEMODELING]:
+                                if self.behaviour in _EXERCISE_PREINSTRUCTION_BEHAVIOURS:
                                     if config.set_count > 1:
                                         nodedata.action = Action(pre_msg, self.score, self.target, demo=demo,
                                                              question=question,
@@ -420,12 +506,10 @@ class FormatAction(Node):
                                                                  question=question,
                                                                  goal=self.goal_level, stat_measure=stat_measure)
                             elif self.goal_level == config.STAT_GOAL and self.phase == config.PHASE_START:
-                                logging.debug("Using config scores in action. goal_level = " + str(
-                                    self.goal_level) + ", behaviour = " + str(self.behaviour) + ", phase = " + str(
-                                    self.phase))
+                                logging.debug("Using config scores in action. goal_level = %s, behaviour = %s, phase = %s", self.goal_level, self.behaviour, self.phase)
                                 nodedata.action = Action(pre_msg, demo=demo, question=question)
                             else:
-                                logging.debug("self.goal_level != STAT_GOAL or self.phase != PHASE_START, self.goal_level = " + str(self.goal_level) + ", self.phase = " + str(self.phase))
+                                logging.debug("self.goal_level != STAT_GOAL or self.phase != PHASE_START, self.goal_level = %s, self.phase = %s", self.goal_level, self.phase)
                                 if self.phase == config.PHASE_START:
                                     logging.debug("phase start")
                                     nodedata.action = Action(pre_msg, demo=demo, question=question)
@@ -449,18 +533,13 @@ class FormatAction(Node):
                     #    config.given_score += 1
             else:
                 # If silence, we still need to update the screen display on Pepper because a rep may have been done.
-                output = {
-                    "silence": "True"
-                }
                 # Send post request to Pepper
-                r = requests.post(config.post_address, json=output)
+                _session.post(config.post_address, json=_SILENCE_OUTPUT)
 
-                logging.debug("Returning FAIL from FormatAction, behaviour = " + str(self.behaviour))
-                logging.debug("Returning FAIL from FormatAction, behaviour = " + str(self.behaviour))
+                logging.debug("Returning FAIL from FormatAction, behaviour = %s", self.behaviour)
                 return NodeStatus(NodeStatus.FAIL, "Behaviour == A_SILENCE")
 
-            logging.debug("Returning SUCCESS from FormatAction, action = " + str(nodedata.action))
-            logging.debug("Returning SUCCESS from FormatAction, action = " + str(nodedata.action))
+            logging.debug("Returning SUCCESS from FormatAction, action = %s", nodedata.action)
             return NodeStatus(NodeStatus.SUCCESS, "Created action from given behaviour.")
         else:
             return NodeStatus(NodeStatus.SUCCESS, "Stop set/session format action")
@@ -502,7 +581,7 @@ class CheckForBehaviour(Node):
             behaviour information.
         :return: None
         """
-        logging.debug("Configuring CheckForBehaviour: " + self._name + ", goal_level = " + str(config.goal_level))
+        logging.debug("Configuring CheckForBehaviour: %s, goal_level = %s", self._name, config.goal_level)
         self.behaviour = nodedata.get_data('behaviour')              # The behaviour selected from the policy
         self.check_behaviour = nodedata.get_data('check_behaviour')  # The behaviour to check against
         self.goal_level = nodedata.get_data('goal', config.goal_level)
@@ -520,36 +599,29 @@ class CheckForBehaviour(Node):
             # TODO: Update for variants of check_behaviour.
             # SUCCESS if next behaviour is given behaviour, else FAIL
             if self._is_example_of_behaviour(self.behaviour, self.check_behaviour):
-                config.used_behaviours = []
-                logging.debug("Returning SUCCESS from CheckForBehaviour, behaviour found = " + str(self.behaviour))
+                config.used_behaviours.clear()
+                logging.debug("Returning SUCCESS from CheckForBehaviour, behaviour found = %s", self.behaviour)
                 # config.completed = config.COMPLETED_STATUS_FALSE
                 config.behaviour_displayed = True  # Set to true so that we get a new behaviour for the new goal level.
                 return NodeStatus(NodeStatus.SUCCESS, "Behaviour " + str(self.check_behaviour) + " found in the form " + str(self.behaviour))
             else:
-                logging.debug("Returning FAIL from CheckForBehaviour, behaviour not found = " + str(self.check_behaviour) + ", input behaviour = " + str(self.behaviour))
+                logging.debug("Returning FAIL from CheckForBehaviour, behaviour not found = %s, input behaviour = %s", self.check_behaviour, self.behaviour)
                 return NodeStatus(NodeStatus.FAIL, "Behaviour " + str(self.check_behaviour) + " not found.")
         else:
             return NodeStatus(NodeStatus.SUCCESS, "Stop set/session check behaviour")
 
     def _is_example_of_behaviour(self, behaviour, check_behaviour):
-        if check_behaviour == config.A_PREINSTRUCTION:
-            check_list = [config.A_PREINSTRUCTION, config.A_PREINSTRUCTION_PRAISE, config.A_PREINSTRUCTION_QUESTIONING,
-                          config.A_PREINSTRUCTION_POSITIVEMODELING, config.A_POSITIVEMODELING_PREINSTRUCTION,
-                          config.A_PREINSTRUCTION_FIRSTNAME, config.A_PREINSTRUCTION_MANUALMANIPULATION,
-                          config.A_PREINSTRUCTION_NEGATIVEMODELING, config.A_MANUALMANIPULATION_PREINSTRUCTION]
-        elif check_behaviour == config.A_QUESTIONING:
+        if check_behaviour == A_PREINSTRUCTION:
+            return behaviour in _PREINSTRUCTION_BEHAVIOURS
+        elif check_behaviour == A_QUESTIONING:
             '''check_list = [config.A_QUESTIONING, config. A_PREINSTRUCTION_QUESTIONING, config.A_QUESTIONING_FIRSTNAME,
                           config.A_QUESTIONING_POSITIVEMODELING, config.A_POSITIVEMODELING_QUESTIONING,
                           config.A_CONCURRENTINSTRUCTIONPOSITIVE_QUESTIONING, config.A_MANUALMANIPULATION_QUESTIONING,
                           config.A_POSTINSTRUCTIONNEGATIVE_QUESTIONING, config.A_POSTINSTRUCTIONPOSITIVE_QUESTIONING,
                           config.A_QUESTIONING_NEGATIVEMODELING]'''
-            check_list = [config.A_QUESTIONING, config.A_QUESTIONING_FIRSTNAME, config.A_QUESTIONING_POSITIVEMODELING,
-                          config.A_POSITIVEMODELING_QUESTIONING, config.A_MANUALMANIPULATION_QUESTIONING,
-                          config.A_QUESTIONING_NEGATIVEMODELING]
+            return behaviour in _QUESTIONING_BEHAVIOURS
         else:
-            check_list = [config.A_END]
-
-        return True if behaviour in check_list else False
+            return behaviour == A_END
 
 
 
@@ -585,8 +657,7 @@ class DisplayBehaviour(Node):
             be performed.
         :return: None
         """
-        logging.debug("Configuring DisplayBehaviour: " + self._name)
-        logging.debug("Configuring DisplayBehaviour: " + self._name)
+        logging.debug("Configuring DisplayBehaviour: %s", self._name)
         self.action = nodedata.get_data('action')
         self.set_start = nodedata.get_data('set_start', False)
         self.score = nodedata.get_data('score', None)
@@ -598,10 +669,10 @@ class DisplayBehaviour(Node):
         :return: NodeStatus.SUCCESS if action sent successfully to robot, NodeStatus.FAIL otherwise.
         """
         if not config.stop_set and not config.stop_session and not config.pause_display:
-            logging.debug(str(self.action))
-            logging.info("Displaying action {}".format(str(self.action)))
+            utterance = str(self.action)  # Action.__str__ builds the full utterance so only do it once.
+            logging.info("Displaying action %s", utterance)
             output = {
-                "utterance": str(self.action)
+                "utterance": utterance
             }
             if self.action.demo is not None:
                 output['demo'] = self.action.demo
@@ -619,20 +690,17 @@ class DisplayBehaviour(Node):
                 else:
                     goal_level = "stat"
                 if config.overridePreInstructionOption:
-                    utteranceURL = config.screen_post_address + str(self.action).replace(' ', '%20') + "/pre/" + goal_level + "/overrideOption"
+                    utteranceURL = config.screen_post_address + utterance.replace(' ', '%20') + "/pre/" + goal_level + "/overrideOption"
                     config.overridePreInstructionOption = False
                 else:
-                    utteranceURL = config.screen_post_address + str(self.action).replace(' ', '%20') + "/question/" + goal_level + "/overrideOption"
+                    utteranceURL = config.screen_post_address + utterance.replace(' ', '%20') + "/question/" + goal_level + "/overrideOption"
                     config.overrideQuestioningOption = False
             else:
-                utteranceURL = config.screen_post_address + str(self.action).replace(' ', '%20') + "/" + phase + "/newUtterance"
-            r = requests.post(utteranceURL)
-            # Send post request to Pepper
-            r = requests.post(config.post_address, json=output)
-
-            # Wait for response before continuing because the session might be paused.
-            while r.status_code is None:
-                time.sleep(0.2)
+                utteranceURL = config.screen_post_address + utterance.replace(' ', '%20') + "/" + phase + "/newUtterance"
+            _post_to_screen(utteranceURL)
+            # Send post request to Pepper. This stays blocking because the robot only responds once it has finished
+            # the behaviour (or the session has been unpaused), so returning from post() is the wait.
+            _session.post(config.post_address, json=output)
 
             config.behaviour_displayed = True
             #config.need_new_behaviour = True
@@ -687,7 +755,7 @@ class GetStats(Node):
             NodeStatus.FAIL otherwise.
         """
         if not config.stop_session:
-            logging.debug("Running GetStats: " + self._name)
+            logging.debug("Running GetStats: %s", self._name)
 
             '''output = {
                 "start": str(1)
@@ -752,10 +820,10 @@ class GetStats(Node):
             # logging.debug("In get stats")
             nodedata.motivation = config.motivation
             nodedata.player_ability = config.ability
-            logging.info("Stats set, motivation = {motivation}, ability = {ability}".format(motivation=nodedata.motivation, ability=nodedata.player_ability))
+            logging.info("Stats set, motivation = %s, ability = %s", nodedata.motivation, nodedata.player_ability)
             #nodedata.sessions = 6
             # logging.debug("After setting stats in GetStats: " + str(nodedata))
-            logging.debug("Returning SUCCESS from GetStats, stats = " + str(nodedata))
+            logging.debug("Returning SUCCESS from GetStats, stats = %s", nodedata)
             return NodeStatus(NodeStatus.SUCCESS, "Set stats to dummy values.")
         else:
             return NodeStatus(NodeStatus.SUCCESS, "Stop session get stats")
@@ -784,7 +852,7 @@ class GetDuration(Node):
         :param nodedata :type Blackboard: the blackboard associated with this Behaviour Tree containing the goal level.
         :return: None
         """
-        logging.debug("Configuring GetDuration: " + self._name)
+        logging.debug("Configuring GetDuration: %s", self._name)
         self.session_duration = nodedata.get_data('session_duration', 1)
         self.start_time = nodedata.get_data('start_time', 0)
 
@@ -797,10 +865,10 @@ class GetDuration(Node):
             and data has been stored in the blackboard, NodeStatus.FAIL otherwise.
         """
         if not config.stop_session:
-            logging.debug("Running GetDuration: " + self._name)
+            logging.debug("Running GetDuration: %s", self._name)
             # Will be ACTIVE when waiting for data and SUCCESS when got data and added to blackboard, FAIL when connection error.
-            logging.info("Set session duration to: {duration}".format(duration=nodedata.session_duration))
-            logging.debug("Returning SUCCESS from GetDuration, session duration = " + str(nodedata.session_duration))
+            logging.info("Set session duration to: %s", nodedata.session_duration)
+            logging.debug("Returning SUCCESS from GetDuration, session duration = %s", nodedata.session_duration)
             return NodeStatus(NodeStatus.SUCCESS, "Set session duration to dummy value 1.")
         else:
             return NodeStatus(NodeStatus.SUCCESS, "Stop session get duration")
@@ -835,10 +903,8 @@ class CreateSubgoal(Node):
         :param nodedata :type Blackboard: the blackboard associated with this Behaviour Tree containing the goal level.
         :return: None
         """
-        logging.debug("Configuring CreateSubgoal: " + self._name)
-        logging.debug(("createSubgoal nodedata = " + str(nodedata)))
-        logging.debug("Configuring CreateSubgoal: " + self._name)
-        logging.debug("createSubgoal nodedata = " + str(nodedata))
+        logging.debug("Configuring CreateSubgoal: %s", self._name)
+        logging.debug("createSubgoal nodedata = %s", nodedata)
         self.previous_goal_level = nodedata.get_data('goal', -1)
         self.shot = nodedata.get_data('shot', config.shot)
         self.hand = nodedata.get_data('hand', config.hand)
@@ -858,11 +924,11 @@ class CreateSubgoal(Node):
                 nodedata.new_goal = config.STAT_GOAL
                 config.getBehaviourGoalLevel = config.STAT_GOAL
                 config.finished_stat = False
-                logging.info("Created subgoal, new goal level = {}".format(nodedata.new_goal))
-                logging.debug("Returning SUCCESS from CreateSubGoal, new goal level = " + str(nodedata.goal))
+                logging.info("Created subgoal, new goal level = %s", nodedata.new_goal)
+                logging.debug("Returning SUCCESS from CreateSubGoal, new goal level = %s", nodedata.goal)
                 return NodeStatus(NodeStatus.SUCCESS, "Created subgoal: 3 from BASELINE_GOAL")
             elif self.previous_goal_level > config.BASELINE_GOAL:
-                logging.debug("Returning FAIL from CreateSubGoal, previous goal level = " + str(self.previous_goal_level))
+                logging.debug("Returning FAIL from CreateSubGoal, previous goal level = %s", self.previous_goal_level)
                 return NodeStatus(NodeStatus.FAIL, "Cannot create subgoal of ACTION_GOAL.")
             else:
                 if self.previous_goal_level == config.EXERCISE_GOAL and not config.doneBaselineGoal:  # (config.score is None or config.score == -1):
@@ -886,8 +952,8 @@ class CreateSubgoal(Node):
                         shotString = config.hand + " " + config.shot
                         # shotString = nodedata.get_data("hand") + " " + nodedata.get_data("shot")
                         utteranceURL = config.screen_post_address + shotString + "/newPicture"
-                        r = requests.post(utteranceURL)
-                        r = requests.post(config.screen_post_address + "0/newRep")
+                        _post_to_screen(utteranceURL)
+                        _post_to_screen(config.screen_post_address + "0/newRep")
                     elif nodedata.new_goal == config.STAT_GOAL:
                         if config.stop_session_on_baseline:
                             config.finished_stat = True
@@ -905,9 +971,9 @@ class CreateSubgoal(Node):
                         print("Ready for stop set.")
                 config.phase = config.PHASE_START  # Start of goal will always be before something happens.
                 nodedata.phase = config.PHASE_START
-                logging.debug("Created subgoal, new goal level = {}".format(nodedata.new_goal))
-                logging.info("Created subgoal, new goal level = {}".format(nodedata.new_goal))
-                logging.debug("Returning SUCCESS from CreateSubGoal, new goal level = " + str(nodedata.new_goal))
+                logging.debug("Created subgoal, new goal level = %s", nodedata.new_goal)
+                logging.info("Created subgoal, new goal level = %s", nodedata.new_goal)
+                logging.debug("Returning SUCCESS from CreateSubGoal, new goal level = %s", nodedata.new_goal)
                 return NodeStatus(NodeStatus.SUCCESS, "Created subgoal: " + str(self.previous_goal_level + 1))
         else:
             if config.stop_session:
@@ -944,8 +1010,7 @@ class EndSubgoal(Node):
         :param nodedata :type Blackboard: the blackboard associated with this Behaviour Tree containing the goal level.
         :return: None
         """
-        logging.debug("Configuring EndSubgoal: " + self._name)
-        logging.debug("Configuring EndSubgoal: " + self._name)
+        logging.debug("Configuring EndSubgoal: %s", self._name)
         self.goal_level = nodedata.get_data('goal', -1)
         self.skipped_create = nodedata.get_data('skipped_create', False)
 
@@ -959,8 +1024,7 @@ class EndSubgoal(Node):
         if not config.stop_set and not self.skipped_create:
             # Will return SUCCESS once request sent to API, FAIL if called on goal > 6 or connection error.
             if self.goal_level > 6 or self.goal_level < 0:
-                logging.debug("Returning FAIL from EndSubgoal, goal_level = " + str(self.goal_level))
-                logging.debug("Returning FAIL from EndSubgoal, goal_level = " + str(self.goal_level))
+                logging.debug("Returning FAIL from EndSubgoal, goal_level = %s", self.goal_level)
                 return NodeStatus(NodeStatus.FAIL, "Cannot create subgoal of " + str(self.goal_level))
             else:
                 if self.goal_level == config.BASELINE_GOAL:
@@ -974,7 +1038,7 @@ class EndSubgoal(Node):
                 else:
                     # config.goal_level -= 1
                     # TODO: I've set max set_count to 3 but there may be some freedom there depending on user performance.
-                    if ((self.goal_level == config.SET_GOAL and config.set_count == config.SETS_PER_STAT) or self.goal_level == config.STAT_GOAL or self.goal_level == config.EXERCISE_GOAL or self.goal_level == config.SESSION_GOAL) and not config.stop_session:
+                    if (self.goal_level in _FEEDBACK_ON_END_GOALS or (self.goal_level == config.SET_GOAL and config.set_count == config.SETS_PER_STAT)) and not config.stop_session:
                         config.phase = config.PHASE_END
                         if self.goal_level == config.STAT_GOAL:
                             config.stat_confirmed = False
@@ -1008,12 +1072,12 @@ class EndSubgoal(Node):
                         config.shot_goal_created = False
                         config.shot_confirmed = False
                         config.doneBaselineGoal = False
-                        logging.debug("config.tidying = " + str(config.tidying))
+                        logging.debug("config.tidying = %s", config.tidying)
                     if self.goal_level == config.ACTION_GOAL:
-                        config.used_behaviours = []
-                logging.debug("Ended subgoal {old_goal}. New goal level = {new_goal}.".format(old_goal=self.goal_level, new_goal=nodedata.new_goal))
-                logging.info("Ended subgoal {old_goal}. New goal level = {new_goal}.".format(old_goal=self.goal_level, new_goal=nodedata.new_goal))
-                logging.debug("Returning SUCCESS from EndSubgoal, new subgoal level = " + str(nodedata.new_goal))
+                        config.used_behaviours.clear()
+                logging.debug("Ended subgoal %s. New goal level = %s.", self.goal_level, nodedata.new_goal)
+                logging.info("Ended subgoal %s. New goal level = %s.", self.goal_level, nodedata.new_goal)
+                logging.debug("Returning SUCCESS from EndSubgoal, new subgoal level = %s", nodedata.new_goal)
                 return NodeStatus(NodeStatus.SUCCESS, "Completed subgoal: " + str(self.goal_level - 1))
         else:
             if self.skipped_create:
@@ -1041,10 +1105,20 @@ class TimestepCue(Node):
             run_cb=self.run,
             configure_cb=self.configure,
             *args, **kwargs)
+        # Goal levels without an entry here just get dummy values from _run_default.
+        self._goal_handlers = {
+            -1: self._run_person,
+            config.PERSON_GOAL: self._run_person,
+            config.SESSION_GOAL: self._run_session,
+            config.EXERCISE_GOAL: self._run_exercise,
+            config.STAT_GOAL: self._run_stat,
+            config.SET_GOAL: self._run_set,
+            config.ACTION_GOAL: self._run_action,
+            config.BASELINE_GOAL: self._run_baseline,
+        }
 
     def configure(self, nodedata):
-        logging.debug("Configureing TimestepCue: " + self._name + ", nodedata: " + str(nodedata))
-        logging.debug("Configuring TimestepCue: " + self._name)
+        logging.debug("Configuring TimestepCue: %s, nodedata: %s", self._name, nodedata)
         self.goal_level = nodedata.get_data('goal')
         self.phase = nodedata.get_data('phase')
         self.shot = nodedata.get_data('shot', config.shot)
@@ -1147,591 +1221,563 @@ class TimestepCue(Node):
             if config.stop_session_on_baseline and self.goal_level is None:
                 self.goal_level = config.EXERCISE_GOAL
                 config.completed = config.COMPLETED_STATUS_FALSE
-            logging.debug("checking goal level: " + str(self.goal_level))
+            logging.debug("checking goal level: %s", self.goal_level)
             # Will be ACTIVE when waiting for data and SUCCESS when got data and added to blackboard, FAIL when connection error.
-            if self.goal_level == -1 or self.goal_level == 0:  # Person goal created after receiving info from guide.
-                logging.debug("Timestep Cue, self.goal_level = " + str(self.goal_level))
-                logging.debug("config.goal_level = " + str(config.goal_level))
-                if config.goal_level == config.PERSON_GOAL:  # For person goal should have name, ability and no. of sessions.
-                    if config.phase == config.PHASE_END:  # Feedback sequence
-                        nodedata.phase = config.PHASE_END
-                        if len(config.session_performance_list) > 0:
-                            nodedata.performance = mode(config.session_performance_list)
-                            # Write updated no. of sessions to file.
-                            f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/Sessions.txt", "r")
-                            file_contents = f.readlines()
-                            f.close()
-
-                            file_contents[0] = str(config.sessions) + "\n"
-                            f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/Sessions.txt", "w")
-                            f.writelines(file_contents)
-                            f.close()
-
-                        nodedata.phase = config.PHASE_END
-                        config.completed = config.COMPLETED_STATUS_TRUE
-                        logging.info(
-                            "Feedback for session, performance = {performance}".format(performance=nodedata.get_data("performance")))
-                        logging.debug("Returning SUCCESS from TimestepCue person goal (end), stats = " + str(nodedata))
-                        return NodeStatus(NodeStatus.SUCCESS, "Data for stat goal obtained from guide:" + str(nodedata))
-                    else:
-                        # Get no. of sessions from file.
-                        try:
-                            f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/Sessions.txt", "r")
-                            file_contents = f.readlines()
-                            f.close()
-                            config.sessions = int(file_contents[0]) + 1
-                        except:
-                            config.sessions = 1
-                            os.mkdir("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo)
-                            f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/Sessions.txt", "a")
-                            f.write(str(config.sessions) + "\n")  # Write participant number and 0 sessions to the new file.
-                            f.close()
-
-                        nodedata.sessions = config.sessions
-                        nodedata.player_ability = config.ability
-                        nodedata.name = config.name
-                        nodedata.phase = config.PHASE_START
-                        config.completed = config.COMPLETED_STATUS_FALSE
-                        logging.debug("Returning SUCCESS from TimestepCue player goal, stats = " + str(nodedata))
-                        return NodeStatus(NodeStatus.SUCCESS, "Data for person goal obtained from guide:" + str(nodedata))
+            handler = self._goal_handlers.get(self.goal_level, self._run_default)
+            status = handler(nodedata)
+            config.waiting_for_guide = status.status == NodeStatus.ACTIVE
+            return status
+        else:
+            config.waiting_for_guide = False
+            return NodeStatus(NodeStatus.SUCCESS, "Stop set timestep cue")
+
+    def _run_person(self, nodedata):
+        """
+        Handle a timestep cue for the person goal.
+        Person goal created after receiving info from guide.
+        :param nodedata :type Blackboard: the blackboard on which we will store the data provided by the guide.
+        :return: the NodeStatus to be returned by run.
+        """
+        logging.debug("Timestep Cue, self.goal_level = %s", self.goal_level)
+        logging.debug("config.goal_level = %s", config.goal_level)
+        if config.goal_level == config.PERSON_GOAL:  # For person goal should have name, ability and no. of sessions.
+            if config.phase == config.PHASE_END:  # Feedback sequence
+                nodedata.phase = config.PHASE_END
+                if len(config.session_performance_list) > 0:
+                    nodedata.performance = mode(config.session_performance_list)
+                    sessions_path = config.session_data_path + config.participantNo + "/Sessions.txt"
+                    # Write updated no. of sessions to file.
+                    file_contents = _read_history(sessions_path)
+
+                    file_contents[0] = str(config.sessions) + "\n"
+                    _write_history(sessions_path, file_contents)
+
+                config.completed = config.COMPLETED_STATUS_TRUE
+                logging.info("Feedback for session, performance = %s", nodedata.get_data("performance"))
+                logging.debug("Returning SUCCESS from TimestepCue person goal (end), stats = %s", nodedata)
+                return NodeStatus(NodeStatus.SUCCESS, "Data for stat goal obtained from guide:" + str(nodedata))
+            else:
+                participant_dir = config.session_data_path + config.participantNo
+                sessions_path = participant_dir + "/Sessions.txt"
+                # Get no. of sessions from file.
+                if os.path.exists(sessions_path):
+                    file_contents = _read_history(sessions_path)
+                    config.sessions = int(file_contents[0]) + 1
                 else:
-                    logging.debug("Returning ACTIVE from TimestepCue player goal")
-                    return NodeStatus(NodeStatus.ACTIVE, "Waiting for person goal data from guide.")
-
-            elif self.goal_level == config.SESSION_GOAL:  # For session goal should have performance from previous session.
-                logging.debug("TimestepCue, config.goal_level = " + str(config.goal_level))
-                if config.goal_level == config.SESSION_GOAL:
-                    if config.phase == config.PHASE_END:  # Feedback sequence
-                        nodedata.phase = config.PHASE_END
-                        if not (len(config.session_performance_list) == 0):
-                            nodedata.performance = mode(config.session_performance_list)
-                            nodedata.score = mean(config.session_score_list)  # config.score
-                            # Write session performance to file.
-                            f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/Sessions.txt", "r")
-                            file_contents = f.readlines()
-                            f.close()
-
-                            file_contents.insert(1, str(nodedata.performance) + ", " + str(nodedata.score) + "\n")
-                            f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo  + "/Sessions.txt", "w")
-                            f.writelines(file_contents)
-                            f.close()
-
-                        nodedata.phase = config.PHASE_END
-
-                        config.stop_session = False  # Resume the final behaviours of the session.
-                        config.completed = config.COMPLETED_STATUS_TRUE
-                        if config.finish_session_baseline_stop:
-                            logging.debug("Setting config.goal_level = PERSON GOAL")
-                            config.goal_level = config.PERSON_GOAL
-
-                        logging.info(
-                            "Feedback for session, performance = {performance}".format(performance=nodedata.get_data("performance")))
-                        logging.debug("Returning SUCCESS from TimestepCue session goal (end), stats = " + str(nodedata))
-                        return NodeStatus(NodeStatus.SUCCESS, "Data for stat goal obtained from guide:" + str(nodedata))
-                    else:
-                        if config.shot_count == 0:
-                            if config.sessions > 1:  # If this is not the first session, get previous performance from file.
-                                f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/Sessions.txt", "r")
-                                file_contents = f.readlines()
-                                f.close()
-
-                                config.performance = int(file_contents[1].split(", ")[0])
-                                config.score = float(file_contents[1].split(" ")[1])
-                        nodedata.performance = config.performance
+                    config.sessions = 1
+                    os.makedirs(participant_dir, exist_ok=True)
+                    _append_history(sessions_path, [str(config.sessions) + "\n"])  # Write participant number and 0 sessions to the new file.
+
+                nodedata.sessions = config.sessions
+                nodedata.player_ability = config.ability
+                nodedata.name = config.name
+                nodedata.phase = config.PHASE_START
+                config.completed = config.COMPLETED_STATUS_FALSE
+                logging.debug("Returning SUCCESS from TimestepCue player goal, stats = %s", nodedata)
+                return NodeStatus(NodeStatus.SUCCESS, "Data for person goal obtained from guide:" + str(nodedata))
+        else:
+            logging.debug("Returning ACTIVE from TimestepCue player goal")
+            return NodeStatus(NodeStatus.ACTIVE, "Waiting for person goal data from guide.")
+
+    def _run_session(self, nodedata):
+        """
+        Handle a timestep cue for the session goal.
+        For session goal should have performance from previous session.
+        :param nodedata :type Blackboard: the blackboard on which we will store the data provided by the guide.
+        :return: the NodeStatus to be returned by run.
+        """
+        logging.debug("TimestepCue, config.goal_level = %s", config.goal_level)
+        if config.goal_level == config.SESSION_GOAL:
+            if config.phase == config.PHASE_END:  # Feedback sequence
+                nodedata.phase = config.PHASE_END
+                if not (len(config.session_performance_list) == 0):
+                    nodedata.performance = mode(config.session_performance_list)
+                    nodedata.score = sum(config.session_score_list) / len(config.session_score_list)  # config.score
+                    sessions_path = config.session_data_path + config.participantNo + "/Sessions.txt"
+                    # Write session performance to file.
+                    file_contents = _read_history(sessions_path)
+
+                    file_contents.insert(1, str(nodedata.performance) + ", " + str(nodedata.score) + "\n")
+                    _write_history(sessions_path, file_contents)
+
+                config.stop_session = False  # Resume the final behaviours of the session.
+                config.completed = config.COMPLETED_STATUS_TRUE
+                if config.finish_session_baseline_stop:
+                    logging.debug("Setting config.goal_level = PERSON GOAL")
+                    config.goal_level = config.PERSON_GOAL
+
+                logging.info("Feedback for session, performance = %s", nodedata.get_data("performance"))
+                logging.debug("Returning SUCCESS from TimestepCue session goal (end), stats = %s", nodedata)
+                return NodeStatus(NodeStatus.SUCCESS, "Data for stat goal obtained from guide:" + str(nodedata))
+            else:
+                if config.shot_count == 0:
+                    if config.sessions > 1:  # If this is not the first session, get previous performance from file.
+                        sessions_path = config.session_data_path + config.participantNo + "/Sessions.txt"
+                        file_contents = _read_history(sessions_path)
+
+                        config.performance = int(file_contents[1].split(", ")[0])
+                        config.score = float(file_contents[1].split(" ")[1])
+                nodedata.performance = config.performance
+                nodedata.score = config.score
+                nodedata.phase = config.PHASE_START
+                config.completed = config.COMPLETED_STATUS_FALSE
+                logging.debug("Returning SUCCESS from TimestepCue session goal, nodedata = %s", nodedata)
+                return NodeStatus(NodeStatus.SUCCESS, "Data for session goal obtained from guide:" + str(nodedata))
+        else:
+            if config.shot_count > 0 and not config.tidying and not config.tidied_up:
+                logging.debug("In timestep cue session goal, setting config.goal_level to SESSION GOAL")
+                config.goal_level = config.SESSION_GOAL
+                config.phase = config.PHASE_START
+            logging.debug("Returning ACTIVE from TimestepCue session goal")
+            return NodeStatus(NodeStatus.ACTIVE, "Waiting for session goal data from guide.")
+
+    def _run_exercise(self, nodedata):
+        """
+        Handle a timestep cue for the exercise (and the end of baseline) goal.
+        For shot goal should have performance from last time this shot was practiced.
+        :param nodedata :type Blackboard: the blackboard on which we will store the data provided by the guide.
+        :return: the NodeStatus to be returned by run.
+        """
+        if config.goal_level == config.EXERCISE_GOAL:
+            if config.phase == config.PHASE_END:  # Feedback sequence
+                if config.completed == config.COMPLETED_STATUS_TRUE:  # This is actually the end of a baseline goal. Might need to update this so it's not as weirdly laid out.
+                    logging.debug("Baseline goal feedback sequence")
+                    # Will get list of scores.
+                    nodedata.phase = config.PHASE_END
+                    nodedata.score = config.metric_score_list
+
+                    exercise_dir = config.session_data_path + config.participantNo + "/" + config.hand + str(config.shot)
+                    file_contents = _read_history(exercise_dir + "/Baseline.txt")
+
+                    stat_list = ["racketPreparation", "approachTiming", "impactCutAngle", "impactSpeed",
+                                 "followThroughRoll", "followThroughTime"]
+                    index = 0
+                    fileCount = 0
+                    # Iterate directory
+                    for path in os.listdir(exercise_dir):
+                        # check if current path is a file
+                        if os.path.isfile(os.path.join(exercise_dir, path)):
+                            fileCount += 1
+                    contentIndex = 1 + (fileCount - 2) * 12
+                    for i in range(0, nodedata.score.__len__()):
+                    # for score in nodedata.score.items():
+                        stat_name = stat_list[index]
+                        file_contents[contentIndex] = str(nodedata.score[stat_name]) + ", " + str(config.stat_list[stat_name]) + ", \n"
+                        index += 1
+                        contentIndex += 2
+
+                    _write_history(exercise_dir + "/Baseline.txt", file_contents)
+
+                    logging.debug("Returning SUCCESS from TimestepCue shot goal (baseline goal end), stats = %s", nodedata)
+                    return NodeStatus(NodeStatus.SUCCESS, "Data for shot goal obtained from guide:" + str(nodedata))
+                elif config.completed == config.COMPLETED_STATUS_FALSE:  # Feedback Sequence
+                    logging.debug("Exercise goal feedback sequence")
+                    nodedata.phase = config.PHASE_END
+                    if not (len(config.shot_performance_list) == 0):
+                        nodedata.performance = mode(config.shot_performance_list)
+                        config.session_performance_list.append(nodedata.performance)
+                        config.performance = nodedata.performance
                         nodedata.score = config.score
-                        nodedata.phase = config.PHASE_START
-                        config.completed = config.COMPLETED_STATUS_FALSE
-                        logging.debug("Returning SUCCESS from TimestepCue session goal, nodedata = " + str(nodedata))
-                        return NodeStatus(NodeStatus.SUCCESS, "Data for session goal obtained from guide:" + str(nodedata))
-                else:
-                    if config.shot_count > 0 and not config.tidying and not config.tidied_up:
-                        logging.debug("In timestep cue session goal, setting config.goal_level to SESSION GOAL")
+                        config.session_score_list.append(nodedata.score)
+
+                        exercise_dir = config.session_data_path + config.participantNo + "/" + config.hand + str(config.shot)
+                        session_path = exercise_dir + "/" + str(config.sessions) + ".txt"
+                        # Write performance data about the exercise just completed to file.
+                        aggregator_contents = _read_history(exercise_dir + "/Aggregator.txt")
+                        logging.debug("File contents = %s", aggregator_contents)
+
+                        this_session_contents = _read_history(session_path)
+
+                        baseline_contents = _read_history(exercise_dir + "/Baseline.txt")
+
+                        this_session_contents.insert(0, str(nodedata.score) + "\n")
+                        this_session_contents.insert(1, str(nodedata.performance) + "\n")
+
+                        aggregator_contents[0] = str(nodedata.score) + "\n"
+                        if len(aggregator_contents) > 1:
+                            aggregator_contents[1] = str(nodedata.performance) + "\n"
+                        else:
+                            aggregator_contents.append(str(nodedata.performance) + "\n")
+
+                        this_session_line_no = 2
+                        while len(this_session_contents) > this_session_line_no:
+                            stat = this_session_contents[this_session_line_no]
+                            this_session_line_no += 1
+                            if not (stat in aggregator_contents):
+                                aggregator_contents.append(stat)
+                                aggregator_contents.append(this_session_contents[this_session_line_no])
+                            else:
+                                index = aggregator_contents.index(stat)
+                                aggregator_contents[index+1] = this_session_contents[this_session_line_no]
+
+                            # Update baseline file
+                            indices = [i for i, e in enumerate(baseline_contents) if e == stat]
+                            index = indices[len(indices) - 1]  # baseline_contents.index(stat)
+                            baseline_contents[index + 1] = this_session_contents[this_session_line_no]
+
+                            this_session_line_no += 1
+                            lines_to_add = int(this_session_contents[this_session_line_no]) + 1
+                            this_session_line_no += lines_to_add
+
+                        logging.debug("File contents = %s", aggregator_contents)
+
+                        _write_history(exercise_dir + "/Aggregator.txt", aggregator_contents)
+
+                        _write_history(session_path, this_session_contents)
+
+                        _write_history(exercise_dir + "/Baseline.txt", baseline_contents)
+
+                    # Clear the controller's lists for the exercise that has just happened.
+                    config.shot_performance_list = []
+                    config.shot_score_list = []
+                    nodedata.target = config.target
+                    config.completed = config.COMPLETED_STATUS_TRUE
+                    if config.finish_session_baseline_stop or config.stop_session_on_baseline:
+                        if config.end_session_stat is not None:
+                            config.stat = config.end_session_stat
+                        else:
+                            config.stat = 'racketPreparation'
+                        config.stat_confirmed = True
                         config.goal_level = config.SESSION_GOAL
-                        config.phase = config.PHASE_START
-                    logging.debug("Returning ACTIVE from TimestepCue session goal")
-                    return NodeStatus(NodeStatus.ACTIVE, "Waiting for session goal data from guide.")
-
-            elif self.goal_level == config.EXERCISE_GOAL:  # For shot goal should have performance from last time this shot was practiced.
-                if config.goal_level == config.EXERCISE_GOAL:
-                    if config.phase == config.PHASE_END:  # Feedback sequence
-                        if config.completed == config.COMPLETED_STATUS_TRUE:  # This is actually the end of a baseline goal. Might need to update this so it's not as weirdly laid out.
-                            logging.debug("Baseline goal feedback sequence")
-                            # Will get list of scores.
-                            nodedata.phase = config.PHASE_END
-                            nodedata.score = config.metric_score_list
-
-                            f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + config.hand + str(config.shot) + "/Baseline.txt", "r")
-                            file_contents = f.readlines()
-                            f.close()
-
-                            stat_list = ["racketPreparation", "approachTiming", "impactCutAngle", "impactSpeed",
-                                         "followThroughRoll", "followThroughTime"]
-                            index = 0
-                            # folder path
-                            dir_path = "/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + config.hand + str(config.shot)
+                    logging.debug("Feedback for shot, score = %s, target = %s, performance = %s", nodedata.get_data("score"), nodedata.get_data("target"), nodedata.get_data("performance"))
+                    logging.debug("Returning SUCCESS from TimestepCue shot goal (end), stats = %s", nodedata)
+                    return NodeStatus(NodeStatus.SUCCESS, "Data for shot goal obtained from guide:" + str(nodedata))
+                else:
+                    logging.debug("Returning FAIL from TimestepCue shot goal, config.completed = COMPLETED_STATUS_UNDEFINED")
+                    return NodeStatus(NodeStatus.FAIL, "Waiting for shot goal data from guide.")  # return FAIL to reset config variables.
+            else:
+                if config.stat_count == 0:  # Not already worked on this shot during this session.
+                    exercise_dir = config.session_data_path + config.participantNo + "/" + config.hand + str(config.shot)
+                    # Get performance data of previous time user did this exercise from file.
+                    try:
+                        logging.debug("Trying to open aggregator")
+                        file_contents = _read_history(exercise_dir + "/Aggregator.txt")
+                        logging.debug("Opened aggregator")
+                        config.performance = int(file_contents[1].replace("\n", ""))
+                        config.score = float(file_contents[0].replace("\n", ""))
+
+                        try:
+                            logging.debug("Trying to open baseline")
+                            # Create sorted stat list. Stat with the lowest score will come first. If this shot hasn't
+                            # been performed before, this will be done at the end of the baseline goal.
+                            file_contents = _read_history(exercise_dir + "/Baseline.txt")
+                            logging.debug("Opened baseline")
+                            stat_acc_set = {}
+                            stat_score_set = {}
+                            stat_perf_set = {}
+                            max = len(file_contents)
                             fileCount = 0
                             # Iterate directory
-                            for path in os.listdir(dir_path):
+                            for path in os.listdir(exercise_dir):
                                 # check if current path is a file
-                                if os.path.isfile(os.path.join(dir_path, path)):
+                                if os.path.isfile(os.path.join(exercise_dir, path)):
                                     fileCount += 1
-                            contentIndex = 1 + (fileCount - 2) * 12
-                            for i in range(0, nodedata.score.__len__()):
-                            # for score in nodedata.score.items():
-                                stat_name = stat_list[index]
-                                file_contents[contentIndex] = str(nodedata.score[stat_name]) + ", " + str(config.stat_list[stat_name]) + ", \n"
-                                index += 1
-                                contentIndex += 2
-
-                            f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + config.hand + str(config.shot) + "/Baseline.txt", "w")
-                            f.writelines(file_contents)
-                            f.close()
-
-                            logging.debug("Returning SUCCESS from TimestepCue shot goal (baseline goal end), stats = " + str(nodedata))
-                            return NodeStatus(NodeStatus.SUCCESS, "Data for shot goal obtained from guide:" + str(nodedata))
-                        elif config.completed == config.COMPLETED_STATUS_FALSE:  # Feedback Sequence
-                            logging.debug("Exercise goal feedback sequence")
-                            nodedata.phase = config.PHASE_END
-                            if not (len(config.shot_performance_list) == 0):
-                                nodedata.performance = mode(config.shot_performance_list)
-                                config.session_performance_list.append(nodedata.performance)
-                                config.performance = mode(config.shot_performance_list)
-                                nodedata.score = config.score
-                                config.session_score_list.append(nodedata.score)
-
-                                # Write performance data about the exercise just completed to file.
-                                f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + str(config.hand) + str(config.shot) + "/Aggregator.txt", "r")
-                                aggregator_contents = f.readlines()
-                                f.close()
-                                logging.debug("File contents = " + str(aggregator_contents))
-
-                                f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + str(config.hand) + str(config.shot) + "/" + str(config.sessions) + ".txt", "r")
-                                this_session_contents = f.readlines()
-                                f.close()
-
-                                f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + str(config.hand) + str(config.shot) + "/Baseline.txt", "r")
-                                baseline_contents = f.readlines()
-                                f.close()
-
-                                this_session_contents.insert(0, str(nodedata.score) + "\n")
-                                this_session_contents.insert(1, str(nodedata.performance) + "\n")
-
-                                aggregator_contents[0] = str(nodedata.score) + "\n"
-                                if len(aggregator_contents) > 1:
-                                    aggregator_contents[1] = str(nodedata.performance) + "\n"
-                                else:
-                                    aggregator_contents.append(str(nodedata.performance) + "\n")
-
-                                this_session_line_no = 2
-                                while len(this_session_contents) > this_session_line_no:
-                                    stat = this_session_contents[this_session_line_no]
-                                    this_session_line_no += 1
-                                    if not (stat in aggregator_contents):
-                                        aggregator_contents.append(stat)
-                                        aggregator_contents.append(this_session_contents[this_session_line_no])
+                            index = (fileCount - 3) * 12
+                            # index = (config.sessions - 1) * 12
+                            while index < max:
+                                stat_name = file_contents[index].replace("\n", "")
+                                logging.debug("stat_name = %s", stat_name)
+                                stat_acc_set[stat_name] = float(file_contents[index+1].split(", ")[1].replace("\n", "").replace(",", "").replace(" ", ""))
+                                logging.debug("stat_acc_set found")
+                                logging.debug("stat_acc_set = %s", stat_acc_set)
+                                stat_score_set[stat_name] = float(file_contents[index+1].split(", ")[0].replace("\n", "").replace(",", "").replace(" ", ""))
+                                logging.debug("stat_score_set found")
+                                logging.debug("stat_score_set = %s", stat_score_set)
+
+                                index += 2
+
+                            index = len(file_contents) - 1
+                            while index >= 1:
+                                stat_name = file_contents[index - 1].replace("\n", "")
+                                try:
+                                    logging.debug("already got performance for %s: %s", stat_name, stat_perf_set[stat_name])
+                                except KeyError as error:
+                                    logging.debug("file_contents.split = %s", file_contents[index].split(", "))
+                                    split = file_contents[index].split(", ")
+                                    if len(split) > 2 and split[2] != "\n":
+                                        stat_perf_set[stat_name] = int(
+                                            split[2].replace("\n", "").replace(",", "").replace(" ", ""))
                                     else:
-                                        index = aggregator_contents.index(stat)
-                                        aggregator_contents[index+1] = this_session_contents[this_session_line_no]
-
-                                    # Update baseline file
-                                    indices = [i for i, e in enumerate(baseline_contents) if e == stat]
-                                    index = indices[len(indices) - 1]  # baseline_contents.index(stat)
-                                    baseline_contents[index + 1] = this_session_contents[this_session_line_no]
-
-                                    this_session_line_no += 1
-                                    lines_to_add = int(this_session_contents[this_session_line_no]) + 1
-                                    this_session_line_no += lines_to_add
-
-                                logging.debug("File contents = " + str(aggregator_contents))
-
-                                f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + str(config.hand) + str(config.shot) + "/Aggregator.txt", "w")
-                                f.writelines(aggregator_contents)
-                                f.close()
-
-                                f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + str(config.hand) + str(config.shot) + "/" + str(config.sessions) + ".txt", "w")
-                                f.writelines(this_session_contents)
-                                f.close()
-
-                                f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + str(config.hand) + str(config.shot) + "/Baseline.txt", "w")
-                                f.writelines(baseline_contents)
-                                f.close()
-
-                            # Clear the controller's lists for the exercise that has just happened.
-                            config.shot_performance_list = []
-                            config.shot_score_list = []
-                            nodedata.target = config.target
-                            config.completed = config.COMPLETED_STATUS_TRUE
-
-                            nodedata.phase = config.PHASE_END
-                            if config.finish_session_baseline_stop or config.stop_session_on_baseline:
-                                if config.end_session_stat is not None:
-                                    config.stat = config.end_session_stat
-                                else:
-                                    config.stat = 'racketPreparation'
-                                config.stat_confirmed = True
-                                config.goal_level = config.SESSION_GOAL
-                            logging.debug(
-                                "Feedback for shot, score = {score}, target = {target}, performance = {performance}".format(
-                                    score=nodedata.get_data("score"), target=nodedata.get_data("target"), performance=nodedata.get_data("performance")))
-                            logging.debug("Returning SUCCESS from TimestepCue shot goal (end), stats = " + str(nodedata))
-                            return NodeStatus(NodeStatus.SUCCESS, "Data for shot goal obtained from guide:" + str(nodedata))
-                        else:
-                            logging.debug("Returning FAIL from TimestepCue shot goal, config.completed = COMPLETED_STATUS_UNDEFINED")
-                            return NodeStatus(NodeStatus.FAIL, "Waiting for shot goal data from guide.")  # return FAIL to reset config variables.
-                    else:
-                        if config.stat_count == 0:  # Not already worked on this shot during this session.
-                            # Get performance data of previous time user did this exercise from file.
-                            try:
-                                logging.debug("Trying to open aggregator")
-                                f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + config.hand + str(config.shot) + "/Aggregator.txt", "r")
-                                logging.debug("Opened aggregator")
-                                file_contents = f.readlines()
-                                f.close()
-                                config.performance = int(file_contents[1].replace("\n", ""))
-                                nodedata.performance = config.performance
-                                config.score = float(file_contents[0].replace("\n", ""))
-                                nodedata.score = config.score
+                                        stat_perf_set[stat_name] = None
+                                    logging.debug("stat_perf_set found")
+                                    logging.debug("stat_perf_set = %s", stat_perf_set)
+
+                                index -= 2
+
+                            #sorted_stat_set = sorted(stat_set.items(), key=operator.itemgetter(1))
+                            #sorted_stat_list = []
+                            #for i in sorted_stat_set:
+                            #    sorted_stat_list.append(i[0])
+                            #sorted_stat_list.reverse()  # Reverse to get most important shot first.
+
+                            config.stat_list = stat_acc_set
+                            config.metric_score_list = stat_acc_set
+                            config.metric_performance_list = stat_perf_set
+                            logging.debug("Config.stat_list = %s", config.stat_list)
+                            logging.debug("Config.metric_score_list = %s", config.metric_score_list)
+                            logging.debug("Config.metric_performance_list = %s", config.metric_performance_list)
+                        except (FileNotFoundError, IndexError, ValueError):
+                            logging.debug("Aggregator text file found but baseline text file not found, in start of exercise goal.")
+
+                    except FileNotFoundError:  # If file doesn't exist, create it.
+                        logging.debug(config.participantNo)
+                        logging.debug(config.hand)
+                        logging.debug(config.shot)
+                        os.mkdir(exercise_dir)
+                        _append_history(exercise_dir + "/Aggregator.txt", ["0"])
+                        config.performance = None
+                        # config.score = None
+
+                    logging.debug("got data from file.")
+                    logging.debug("config.score = %s", config.score)
+                    logging.debug("config.performance = %s", config.performance)
+                nodedata.performance = config.performance
+                nodedata.score = config.score
+                nodedata.target = config.target
+                config.completed = config.COMPLETED_STATUS_FALSE
 
-                                try:
-                                    logging.debug("Trying to open baseline")
-                                    # Create sorted stat list. Stat with the lowest score will come first. If this shot hasn't
-                                    # been performed before, this will be done at the end of the baseline goal.
-                                    f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + config.hand + str(config.shot) + "/Baseline.txt", "r")
-                                    logging.debug("Opened baseline")
-                                    file_contents = f.readlines()
-                                    f.close()
-                                    logging.debug("Closed file")
-                                    stat_acc_set = {}
-                                    stat_score_set = {}
-                                    stat_perf_set = {}
-                                    max = len(file_contents)
-                                    # folder path
-                                    dir_path = "/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + config.hand + str(
-                                        config.shot)
-                                    fileCount = 0
-                                    # Iterate directory
-                                    for path in os.listdir(dir_path):
-                                        # check if current path is a file
-                                        if os.path.isfile(os.path.join(dir_path, path)):
-                                            fileCount += 1
-                                    index = (fileCount - 3) * 12
-                                    # index = (config.sessions - 1) * 12
-                                    while index < max:
-                                        stat_name = file_contents[index].replace("\n", "")
-                                        logging.debug("stat_name = " + stat_name)
-                                        stat_acc_set[stat_name] = float(file_contents[index+1].split(", ")[1].replace("\n", "").replace(",", "").replace(" ", ""))
-                                        logging.debug("stat_acc_set found")
-                                        logging.debug("stat_acc_set = " + str(stat_acc_set))
-                                        stat_score_set[stat_name] = float(file_contents[index+1].split(", ")[0].replace("\n", "").replace(",", "").replace(" ", ""))
-                                        logging.debug("stat_score_set found")
-                                        logging.debug("stat_score_set = " + str(stat_score_set))
-
-                                        index += 2
-
-                                    index = len(file_contents) - 1
-                                    while index >= 1:
-                                        stat_name = file_contents[index - 1].replace("\n", "")
-                                        try:
-                                            logging.debug("already got performance for " + stat_name + ": " + str(stat_perf_set[stat_name]))
-                                        except KeyError as error:
-                                            logging.debug("file_contents.split = " + str(file_contents[index].split(", ")))
-                                            split = file_contents[index].split(", ")
-                                            if len(split) > 2 and split[2] != "\n":
-                                                stat_perf_set[stat_name] = int(
-                                                    split[2].replace("\n", "").replace(",", "").replace(" ", ""))
-                                            else:
-                                                stat_perf_set[stat_name] = None
-                                            logging.debug("stat_perf_set found")
-                                            logging.debug("stat_perf_set = " + str(stat_perf_set))
-
-                                        index -= 2
-
-                                    #sorted_stat_set = sorted(stat_set.items(), key=operator.itemgetter(1))
-                                    #sorted_stat_list = []
-                                    #for i in sorted_stat_set:
-                                    #    sorted_stat_list.append(i[0])
-                                    #sorted_stat_list.reverse()  # Reverse to get most important shot first.
-
-                                    config.stat_list = stat_acc_set
-                                    config.metric_score_list = stat_acc_set
-                                    config.metric_performance_list = stat_perf_set
-                                    logging.debug("Config.stat_list = " + str(config.stat_list))
-                                    logging.debug("Config.metric_score_list = " + str(config.metric_score_list))
-                                    logging.debug("Config.metric_performance_list = " + str(config.metric_performance_list))
-                                except:
-                                    logging.debug("Aggregator text file found but baseline text file not found, in start of exercise goal.")
-
-                            except:  # If file doesn't exist, create it.
-                                logging.debug(config.participantNo)
-                                logging.debug(config.hand)
-                                logging.debug(config.shot)
-                                os.mkdir("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + config.hand + str(config.shot))
-                                f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + config.hand + str(config.shot) + "/Aggregator.txt", "a")
-                                file_contents = "0"
-                                f.write(file_contents)
-                                f.close()
-                                config.performance = None
-                                # config.score = None
-
-                            logging.debug("got data from file.")
-                            logging.debug("config.score = " + str(config.score))
-                            logging.debug("config.performance = " + str(config.performance))
-                        nodedata.performance = config.performance
-                        nodedata.score = config.score
-                        nodedata.target = config.target
-                        config.completed = config.COMPLETED_STATUS_FALSE
+                nodedata.phase = config.PHASE_START
+                # config.goal_level = config.SET_GOAL
+                logging.debug("Returning SUCCESS from TimestepCue exercise goal, stats = %s", nodedata)
+                return NodeStatus(NodeStatus.SUCCESS, "Data for exercise goal obtained from guide:" + str(nodedata))
+        else:
+            if config.stat_count > 0 and not config.tidying and not config.tidied_up:
+                config.goal_level = config.EXERCISE_GOAL
+                config.phase = config.PHASE_START
+            logging.debug("Returning FAIL from TimestepCue exercise goal, config.goal_level != 2")
+            return NodeStatus(NodeStatus.FAIL, "Waiting for exercise goal data from guide.")  # returning FAIL so it configures again.
 
-                        nodedata.phase = config.PHASE_START
-                        # config.goal_level = config.SET_GOAL
-                        logging.debug("Returning SUCCESS from TimestepCue exercise goal, stats = " + str(nodedata))
-                        return NodeStatus(NodeStatus.SUCCESS, "Data for exercise goal obtained from guide:" + str(nodedata))
-                else:
-                    if config.stat_count > 0 and not config.tidying and not config.tidied_up:
-                        config.goal_level = config.EXERCISE_GOAL
-                        config.phase = config.PHASE_START
-                    logging.debug("Returning FAIL from TimestepCue exercise goal, config.goal_level != 2")
-                    return NodeStatus(NodeStatus.FAIL, "Waiting for exercise goal data from guide.")  # returning FAIL so it configures again.
-
-            elif self.goal_level == config.STAT_GOAL:  # For stat goal should have target and performance from last time this stat was practiced.
-                if config.goal_level == config.STAT_GOAL:
-                    if config.phase == config.PHASE_END:  # Feedback sequence
-                        # Aggregate performance data about this stat and write it to file.
-                        if not (len(config.stat_performance_list) == 0):
-                            nodedata.performance = config.performance
-                            nodedata.phase = config.PHASE_END
-                            nodedata.score = config.score
-                            nodedata.target = config.target
-
-                            f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + config.hand + str(config.shot) + "/" + str(config.sessions) + ".txt", "r")
-                            file_contents = f.readlines()
-                            f.close()
-
-                            logging.debug("file contents of session_no.txt = " + str(file_contents))
-                            stat_name = str(config.stat) + "\n"
-                            # Find last occurence of stat_name in file_contents:
-                            index = 0
-                            for i in range(0, len(file_contents)):
-                                if file_contents[i] == stat_name:
-                                    index = i
-
-                            # index = file_contents.index(stat_name)
-                            file_contents.insert(index+1, str(nodedata.score) + ", " + str(config.accuracy) + ", " + str(nodedata.performance) + ", \n")
-
-                            f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + config.hand + str(config.shot) + "/" + str(config.sessions) + ".txt", "w")
-                            f.writelines(file_contents)
-                            f.close()
-
-                            config.shot_performance_list.append(nodedata.performance)
-                            config.shot_score_list.append(nodedata.score)
-
-                            # Clear the controller's lists for the stat that has just happened.
-                            config.stat_performance_list = []
-                            config.stat_score_list = []
-
-                            nodedata.phase = config.PHASE_END
-                        config.completed = config.COMPLETED_STATUS_TRUE
-                        logging.info("Feedback for stat, score = {score}, target = {target}, performance = {performance}".format(score=nodedata.get_data("score"), target=nodedata.get_data("target"), performance=nodedata.get_data("performance")))
-                        logging.debug("Returning SUCCESS from TimestepCue stat goal, stats = " + str(nodedata))
-                        return NodeStatus(NodeStatus.SUCCESS, "Data for stat goal obtained from guide:" + str(nodedata))
+    def _run_stat(self, nodedata):
+        """
+        Handle a timestep cue for the stat goal.
+        For stat goal should have target and performance from last time this stat was practiced.
+        :param nodedata :type Blackboard: the blackboard on which we will store the data provided by the guide.
+        :return: the NodeStatus to be returned by run.
+        """
+        if config.goal_level == config.STAT_GOAL:
+            if config.phase == config.PHASE_END:  # Feedback sequence
+                # Aggregate performance data about this stat and write it to file.
+                if not (len(config.stat_performance_list) == 0):
+                    nodedata.performance = config.performance
+                    nodedata.phase = config.PHASE_END
+                    nodedata.score = config.score
+                    nodedata.target = config.target
+
+                    session_path = config.session_data_path + config.participantNo + "/" + config.hand + str(config.shot) + "/" + str(config.sessions) + ".txt"
+                    file_contents = _read_history(session_path)
+
+                    logging.debug("file contents of session_no.txt = %s", file_contents)
+                    stat_name = str(config.stat) + "\n"
+                    # Find last occurence of stat_name in file_contents:
+                    index = 0
+                    for i in range(0, len(file_contents)):
+                        if file_contents[i] == stat_name:
+                            index = i
+
+                    # index = file_contents.index(stat_name)
+                    file_contents.insert(index+1, str(nodedata.score) + ", " + str(config.accuracy) + ", " + str(nodedata.performance) + ", \n")
+
+                    _write_history(session_path, file_contents)
+
+                    config.shot_performance_list.append(nodedata.performance)
+                    config.shot_score_list.append(nodedata.score)
+
+                    # Clear the controller's lists for the stat that has just happened.
+                    config.stat_performance_list = []
+                    config.stat_score_list = []
+                config.completed = config.COMPLETED_STATUS_TRUE
+                logging.info("Feedback for stat, score = %s, target = %s, performance = %s", nodedata.get_data("score"), nodedata.get_data("target"), nodedata.get_data("performance"))
+                logging.debug("Returning SUCCESS from TimestepCue stat goal, stats = %s", nodedata)
+                return NodeStatus(NodeStatus.SUCCESS, "Data for stat goal obtained from guide:" + str(nodedata))
+            else:
+                exercise_dir = config.session_data_path + config.participantNo + "/" + config.hand + str(config.shot)
+                session_path = exercise_dir + "/" + str(config.sessions) + ".txt"
+                # Get performance data of previous time user did this stat for this exercise from file.
+                stat_name = str(config.stat) + "\n"
+                try:
+                    logging.debug("Getting last time's data from file.")
+                    file_contents = _read_history(exercise_dir + "/Aggregator.txt")
+
+                    if stat_name in file_contents:
+                        index = 0
+                        for i in range(0, len(file_contents)):
+                            if file_contents[i] == stat_name:
+                                index = i
+                        # index = file_contents.index(stat_name)
+                        split = file_contents[index+1].split(", ")
+                        config.score = float(split[0])
+                        config.performance = int(split[2].replace("\n", "").replace(",", "").replace(" ", ""))
+                        logging.debug("Stat in file. score = %s, performance = %s", config.score, config.performance)
                     else:
-                        # Get performance data of previous time user did this stat for this exercise from file.
-                        stat_name = None
-                        try:
-                            logging.debug("Getting last time's data from file.")
-                            f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + config.hand + str(config.shot) + "/Aggregator.txt", "r")
-                            file_contents = f.readlines()
-                            f.close()
-
-                            stat_name = str(config.stat) + "\n"
-                            if stat_name in file_contents:
-                                index = 0
-                                for i in range(0, len(file_contents)):
-                                    if file_contents[i] == stat_name:
-                                        index = i
-                                # index = file_contents.index(stat_name)
-                                split = file_contents[index+1].split(", ")
-                                config.score = float(split[0])
-                                config.performance = int(split[2].replace("\n", "").replace(",", "").replace(" ", ""))
-                                logging.debug("Stat in file. score = " + str(config.score) + ", performance = " + str(config.performance))
-                            else:
-                                logging.debug("Stat not in file: " + stat_name)
-                                config.performance = None
-                                # config.score = None
-                        except:
-                            logging.debug("File error")
+                        logging.debug("Stat not in file: %s", stat_name)
+                        config.performance = None
+                        # config.score = None
+                except (FileNotFoundError, IndexError, ValueError):
+                    logging.debug("File error")
 
-                        try:
-                            f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + config.hand + str(config.shot) + "/" + str(config.sessions) + ".txt", "r")
-                            file_contents = f.readlines()
-                            f.close()
-                        except:
-                            f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + config.hand + str(config.shot) + "/" + str(config.sessions) + ".txt", "a")
-                            file_contents = []
-                            f.close()
-
-                        file_contents.append(stat_name)
-                        f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + config.hand + str(config.shot) + "/" + str(config.sessions) + ".txt", "w")
-                        f.writelines(file_contents)
-                        f.close()
-
-                        config.completed = config.COMPLETED_STATUS_FALSE
-                        nodedata.performance = config.performance
-                        nodedata.phase = config.PHASE_START
-                        logging.debug("Returning SUCCESS from TimestepCue stat goal, stats = " + str(nodedata))
-                        return NodeStatus(NodeStatus.SUCCESS, "Data for stat goal obtained from guide:" + str(nodedata))
-                else:
-                    logging.debug("Returning ACTIVE from TimestepCue stat goal")
-                    return NodeStatus(NodeStatus.ACTIVE, "Waiting for stat goal data from guide.")
-
-            elif self.goal_level == config.SET_GOAL:
-                logging.debug("config.goal_level = " + str(config.goal_level))
-                if config.goal_level == config.SET_GOAL:
-                    logging.debug("config.goal_level == config.SET_GOAL")
-                    if config.phase == config.PHASE_END:  # Just finished previous goal level so into feedback sequence.
-                        logging.debug("set goal phase end")
-                        nodedata.phase = config.PHASE_END
-                        if not (len(config.set_performance_list) == 0):
-                            # logging.debug("performance list = " + str(config.set_performance_list) + ", mode = " + str(mode(config.set_performance_list)))
-                            nodedata.performance = config.performance
-                            logging.debug("Average performance = " + str(nodedata.get_data("performance")))
-                            nodedata.score = config.avg_score
-                            logging.debug("config.avg_score = " + str(config.avg_score))
-                            logging.debug("nodedata.score = " + str(nodedata.get_data("score")))
-                            # Update score in controller
-                            config.stat_performance_list.append(nodedata.performance)
-                            config.stat_score_list.append(nodedata.score)
-
-                            # Write to file
-                            f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + config.hand + str(config.shot) + "/" + str(config.sessions) + ".txt", "r")
-                            file_contents = f.readlines()
-                            f.close()
-
-                            file_contents.append(str(nodedata.score) + ", " + str(nodedata.performance) + ", \n")
-                            f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + config.hand + str(config.shot) + "/" + str(config.sessions) + ".txt", "w")
-                            f.writelines(file_contents)
-                            f.close()
-
-                        # Clear the controller's lists for the set that has just happened.
-                        config.set_performance_list = []
-                        config.set_score_list = []
-                        nodedata.target = config.target
-                        config.completed = config.COMPLETED_STATUS_TRUE
-                        if config.set_count < config.SETS_PER_STAT:
-                            logging.debug("Manually subtracting 1 from config.goal_level")
-                            config.goal_level -= 1  # Do this manually here because the app doesn't send data between sets.
-                            logging.debug("New config.goal_level = " + str(config.goal_level))
-                        logging.info("Feedback for exercise set, score = {score}, target = {target}, performance = {performance}".format(score=nodedata.get_data("score"), target=nodedata.get_data("target"), performance=nodedata.get_data("performance")))
-                        logging.debug("Returning SUCCESS from TimestepCue set goal feedback, stats = " + str(nodedata))
-                        return NodeStatus(NodeStatus.SUCCESS, "Data for set goal obtained from guide:" + str(nodedata))
-                    else:  # For set goal we need information about the previous set if this is not the first set of this exercise.
-                        logging.debug("Set goal phase start")
-                        nodedata.phase = config.PHASE_START
-
-                        f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + config.hand + str(config.shot) + "/" + str(config.sessions) + ".txt", "r")
-                        file_contents = f.readlines()
-                        f.close()
-                        stat_name = str(config.stat) + "\n"
-
-                        if len(config.stat_performance_list) > 0:
-                            logging.debug("Stat_performance_list not empty")
-                            nodedata.performance = config.stat_performance_list[len(config.set_performance_list) - 1]  # Get last entry of stat performance list.
-                            nodedata.score = config.stat_score_list[len(config.stat_score_list) - 1]
-
-                            index = 0
-                            for i in range(0, len(file_contents)):
-                                if file_contents[i] == stat_name:
-                                    index = i
-                            # index = file_contents.index(stat_name)
-                            if len(file_contents) > index:
-                                file_contents[index+1] = str(config.set_count + 1) + "\n"
-                            else:
-                                file_contents.append(str(config.set_count + 1) + "\n")
-                            f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + config.hand + str(config.shot) + "/" + str(config.sessions) + ".txt", "w")
-                            f.writelines(file_contents)
-                            f.close()
-                        else:
-                            logging.debug("stat_performance_list empty")
-                            # nodedata.performance = None
-                            logging.debug("config.score = " + str(config.score))
-                            nodedata.score = config.score
-                            logging.debug("set nodedata.score = " + str(nodedata.score))
-
-                            file_contents.append(str(config.set_count + 1) + "\n")
-                            f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + config.hand + str(config.shot) + "/" + str(config.sessions) + ".txt", "w")
-                            f.writelines(file_contents)
-                            f.close()
-
-                        nodedata.target = config.target
-                        config.shot_count = 0
-                        logging.debug("Setting to completed status false")
-                        config.completed = config.COMPLETED_STATUS_FALSE
-                        logging.debug("Returning SUCCESS from TimestepCue set goal, stats = " + str(nodedata))
-                        return NodeStatus(NodeStatus.SUCCESS, "Data for set goal obtained from guide:" + str(nodedata))
-                else:
-                    # config.goal_level = config.SET_GOAL
-                    # config.phase = config.PHASE_END
-                    if config.goal_level == config.STAT_GOAL and config.stat_count > 1:
-                        config.completed = config.COMPLETED_STATUS_FALSE
-                    logging.debug("Returning ACTIVE from TimestepCue set goal")
-                    logging.debug("Returning ACTIVE from TimestepCue set goal")
-                    return NodeStatus(NodeStatus.ACTIVE, "Waiting for set goal data from guide.")
-
-            elif self.goal_level == config.ACTION_GOAL and not config.stop_session:
-                logging.debug("Timestep cue action goal")
-                if config.goal_level == config.ACTION_GOAL:
-                    config.goal_level = config.SET_GOAL
-                    nodedata.phase = config.PHASE_END
+                _append_history(session_path, [stat_name])  # Creates the file if this is the first stat of the session.
+
+                config.completed = config.COMPLETED_STATUS_FALSE
+                nodedata.performance = config.performance
+                nodedata.phase = config.PHASE_START
+                logging.debug("Returning SUCCESS from TimestepCue stat goal, stats = %s", nodedata)
+                return NodeStatus(NodeStatus.SUCCESS, "Data for stat goal obtained from guide:" + str(nodedata))
+        else:
+            logging.debug("Returning ACTIVE from TimestepCue stat goal")
+            return NodeStatus(NodeStatus.ACTIVE, "Waiting for stat goal data from guide.")
+
+    def _run_set(self, nodedata):
+        """
+        Handle a timestep cue for the set goal.
+        :param nodedata :type Blackboard: the blackboard on which we will store the data provided by the guide.
+        :return: the NodeStatus to be returned by run.
+        """
+        logging.debug("config.goal_level = %s", config.goal_level)
+        if config.goal_level == config.SET_GOAL:
+            logging.debug("config.goal_level == config.SET_GOAL")
+            if config.phase == config.PHASE_END:  # Just finished previous goal level so into feedback sequence.
+                logging.debug("set goal phase end")
+                nodedata.phase = config.PHASE_END
+                if not (len(config.set_performance_list) == 0):
+                    # logging.debug("performance list = " + str(config.set_performance_list) + ", mode = " + str(mode(config.set_performance_list)))
                     nodedata.performance = config.performance
-                    config.set_performance_list.append(nodedata.get_data("performance"))
-                    nodedata.score = config.action_score
-                    config.set_score_list.append(nodedata.get_data("score"))
-                    nodedata.target = config.target
-                    logging.debug("Returning SUCCESS from TimestepCue action goal")
-                    logging.debug("Returning SUCCESS from TimestepCue action goal, stats = " + str(nodedata))
-                    return NodeStatus(NodeStatus.SUCCESS, "Data for action goal obtained from guide:" + str(nodedata))
-                else:
-                    # config.goal_level = config.ACTION_GOAL
-                    logging.debug("Returning ACTIVE from TimestepCue action goal")
-                    logging.debug("Returning ACTIVE from TimestepCue action goal")
-                    return NodeStatus(NodeStatus.ACTIVE, "Waiting for action goal input from operator.")
-
-            elif self.goal_level == config.BASELINE_GOAL:
-                if config.goal_level == 4:  # Baseline goal intro sequence
-                    nodedata.phase = config.PHASE_START
-                    config.shot_count = 0
-                    config.completed = config.COMPLETED_STATUS_FALSE
-
-                    # Create file for baseline goal.
-                    f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + config.hand + str(config.shot) + "/Baseline.txt", "a")
-                    file_contents = ["racketPreparation\n",
-                                     "0\n",
-                                     "approachTiming\n",
-                                     "0\n",
-                                     "impactCutAngle\n",
-                                     "0\n",
-                                     "impactSpeed\n",
-                                     "0\n",
-                                     "followThroughRoll\n",
-                                     "0\n",
-                                     "followThroughTime\n",
-                                     "0\n"]
-                    f.writelines(file_contents)
-                    f.close()
-                    logging.debug("Returning SUCCESS from TimestepCue baseline goal, stats = " + str(nodedata))
-                    return NodeStatus(NodeStatus.SUCCESS, "Data for baseline goal obtained from guide:" + str(nodedata))
+                    logging.debug("Average performance = %s", nodedata.get_data("performance"))
+                    nodedata.score = config.avg_score
+                    logging.debug("config.avg_score = %s", config.avg_score)
+                    logging.debug("nodedata.score = %s", nodedata.get_data("score"))
+                    # Update score in controller
+                    config.stat_performance_list.append(nodedata.performance)
+                    config.stat_score_list.append(nodedata.score)
+
+                    session_path = config.session_data_path + config.participantNo + "/" + config.hand + str(config.shot) + "/" + str(config.sessions) + ".txt"
+                    # Write to file
+                    _append_history(session_path, [str(nodedata.score) + ", " + str(nodedata.performance) + ", \n"])
+
+                # Clear the controller's lists for the set that has just happened.
+                config.set_performance_list = []
+                config.set_score_list = []
+                nodedata.target = config.target
+                config.completed = config.COMPLETED_STATUS_TRUE
+                if config.set_count < config.SETS_PER_STAT:
+                    logging.debug("Manually subtracting 1 from config.goal_level")
+                    config.goal_level -= 1  # Do this manually here because the app doesn't send data between sets.
+                    logging.debug("New config.goal_level = %s", config.goal_level)
+                logging.info("Feedback for exercise set, score = %s, target = %s, performance = %s", nodedata.get_data("score"), nodedata.get_data("target"), nodedata.get_data("performance"))
+                logging.debug("Returning SUCCESS from TimestepCue set goal feedback, stats = %s", nodedata)
+                return NodeStatus(NodeStatus.SUCCESS, "Data for set goal obtained from guide:" + str(nodedata))
+            else:  # For set goal we need information about the previous set if this is not the first set of this exercise.
+                logging.debug("Set goal phase start")
+                session_path = config.session_data_path + config.participantNo + "/" + config.hand + str(config.shot) + "/" + str(config.sessions) + ".txt"
+                nodedata.phase = config.PHASE_START
+
+                if len(config.stat_performance_list) > 0:
+                    logging.debug("Stat_performance_list not empty")
+                    nodedata.performance = config.stat_performance_list[len(config.set_performance_list) - 1]  # Get last entry of stat performance list.
+                    nodedata.score = config.stat_score_list[len(config.stat_score_list) - 1]
+
+                    file_contents = _read_history(session_path)
+                    stat_name = str(config.stat) + "\n"
+                    index = 0
+                    for i in range(0, len(file_contents)):
+                        if file_contents[i] == stat_name:
+                            index = i
+                    # index = file_contents.index(stat_name)
+                    if len(file_contents) > index:
+                        file_contents[index+1] = str(config.set_count + 1) + "\n"
+                    else:
+                        file_contents.append(str(config.set_count + 1) + "\n")
+                    _write_history(session_path, file_contents)
                 else:
-                    config.goal_level = 4
-                    logging.debug("Returning ACTIVE from TimestepCue baseline goal")
-                    return NodeStatus(NodeStatus.ACTIVE, "Waiting for baseline goal data from guide.")
+                    logging.debug("stat_performance_list empty")
+                    # nodedata.performance = None
+                    logging.debug("config.score = %s", config.score)
+                    nodedata.score = config.score
+                    logging.debug("set nodedata.score = %s", nodedata.score)
+
+                    _append_history(session_path, [str(config.set_count + 1) + "\n"])
 
-            nodedata.performance = config.MET
+                nodedata.target = config.target
+                config.shot_count = 0
+                logging.debug("Setting to completed status false")
+                config.completed = config.COMPLETED_STATUS_FALSE
+                logging.debug("Returning SUCCESS from TimestepCue set goal, stats = %s", nodedata)
+                return NodeStatus(NodeStatus.SUCCESS, "Data for set goal obtained from guide:" + str(nodedata))
+        else:
+            # config.goal_level = config.SET_GOAL
+            # config.phase = config.PHASE_END
+            if config.goal_level == config.STAT_GOAL and config.stat_count > 1:
+                config.completed = config.COMPLETED_STATUS_FALSE
+            logging.debug("Returning ACTIVE from TimestepCue set goal")
+            return NodeStatus(NodeStatus.ACTIVE, "Waiting for set goal data from guide.")
+
+    def _run_action(self, nodedata):
+        """
+        Handle a timestep cue for the action goal.
+        :param nodedata :type Blackboard: the blackboard on which we will store the data provided by the guide.
+        :return: the NodeStatus to be returned by run.
+        """
+        if config.stop_session:
+            return self._run_default(nodedata)
+        logging.debug("Timestep cue action goal")
+        if config.goal_level == config.ACTION_GOAL:
+            config.goal_level = config.SET_GOAL
+            nodedata.phase = config.PHASE_END
+            nodedata.performance = config.performance
+            config.set_performance_list.append(config.performance)
+            nodedata.score = config.action_score
+            config.set_score_list.append(config.action_score)
+            nodedata.target = config.target
+            logging.debug("Returning SUCCESS from TimestepCue action goal, stats = %s", nodedata)
+            return NodeStatus(NodeStatus.SUCCESS, "Data for action goal obtained from guide:" + str(nodedata))
+        else:
+            # config.goal_level = config.ACTION_GOAL
+            logging.debug("Returning ACTIVE from TimestepCue action goal")
+            return NodeStatus(NodeStatus.ACTIVE, "Waiting for action goal input from operator.")
+
+    def _run_baseline(self, nodedata):
+        """
+        Handle a timestep cue for the baseline goal.
+        :param nodedata :type Blackboard: the blackboard on which we will store the data provided by the guide.
+        :return: the NodeStatus to be returned by run.
+        """
+        if config.goal_level == 4:  # Baseline goal intro sequence
             nodedata.phase = config.PHASE_START
-            nodedata.target = 0.80
-            nodedata.score = 0.79
-            logging.debug("Returning SUCCESS from TimestepCue, stats = " + str(nodedata))
-            return NodeStatus(NodeStatus.SUCCESS, "Set timestep cue values to dummy values MET, PHASE_START, 0.80, 0.79.")
+            config.shot_count = 0
+            config.completed = config.COMPLETED_STATUS_FALSE
+
+            # Create file for baseline goal.
+            file_contents = ["racketPreparation\n",
+                             "0\n",
+                             "approachTiming\n",
+                             "0\n",
+                             "impactCutAngle\n",
+                             "0\n",
+                             "impactSpeed\n",
+                             "0\n",
+                             "followThroughRoll\n",
+                             "0\n",
+                             "followThroughTime\n",
+                             "0\n"]
+            _append_history(config.session_data_path + config.participantNo + "/" + config.hand + str(config.shot) + "/Baseline.txt", file_contents)
+            logging.debug("Returning SUCCESS from TimestepCue baseline goal, stats = %s", nodedata)
+            return NodeStatus(NodeStatus.SUCCESS, "Data for baseline goal obtained from guide:" + str(nodedata))
         else:
-            return NodeStatus(NodeStatus.SUCCESS, "Stop set timestep cue")
+            config.goal_level = 4
+            logging.debug("Returning ACTIVE from TimestepCue baseline goal")
+            return NodeStatus(NodeStatus.ACTIVE, "Waiting for baseline goal data from guide.")
+
+    def _run_default(self, nodedata):
+        """
+        Set dummy values on the blackboard for goal levels which do not need any data from the guide.
+        :param nodedata :type Blackboard: the blackboard on which we will store the dummy values.
+        :return: NodeStatus.SUCCESS
+        """
+        nodedata.performance = config.MET
+        nodedata.phase = config.PHASE_START
+        nodedata.target = 0.80
+        nodedata.score = 0.79
+        logging.debug("Returning SUCCESS from TimestepCue, stats = %s", nodedata)
+        return NodeStatus(NodeStatus.SUCCESS, "Set timestep cue values to dummy values MET, PHASE_START, 0.80, 0.79.")
 
 
 class DurationCheck(Node):
@@ -1758,6 +1804,8 @@ class DurationCheck(Node):
             run_cb=self.run,
             configure_cb=self.configure,
             *args, **kwargs)
+        # Whether the time limit had been reached on the previous tick, so progress is only logged when it changes.
+        self._limit_reached = None
 
     def configure(self, nodedata):
         """
@@ -1765,8 +1813,7 @@ class DurationCheck(Node):
         :param nodedata :type Blackboard: the blackboard associated with this Behaviour Tree containing the time data.
         :return: None
         """
-        logging.debug("Configuring DurationCheck: " + self._name)
-        logging.debug("Configuring DurationCheck: " + self._name)
+        logging.debug("Configuring DurationCheck: %s", self._name)
         self.start_time = nodedata.get_data('start_time')
         self.session_duration = nodedata.get_data('session_duration')
         # Only use until getting actual time:
@@ -1784,12 +1831,15 @@ class DurationCheck(Node):
             self.session_duration = self.current_time - self.start_time
 
             session_duration_delta = self.session_duration.total_seconds()
-            if session_duration_delta < config.MAX_SESSION_TIME:
+            limit_reached = session_duration_delta >= config.MAX_SESSION_TIME
+            limit_changed = limit_reached != self._limit_reached
+            self._limit_reached = limit_reached
+            if not limit_reached:
                 config.tidied_up = False
-                logging.debug("Session time limit NOT reached, current duration = {a}, session limit = {limit}.".format(
-                    a=session_duration_delta, limit=config.MAX_SESSION_TIME))
-                # logging.info("Session time limit NOT reached, current duration = {a}, session limit = {limit}.".format(a=self.current_time - self.start_time, limit=self.session_duration))
-                logging.debug("Returning FAIL from DurationCheck - time limit not yet reached, current time = " + str(self.current_time))
+                if limit_changed:
+                    logging.debug("Session time limit NOT reached, current duration = %s, session limit = %s.", session_duration_delta, config.MAX_SESSION_TIME)
+                    # logging.info("Session time limit NOT reached, current duration = {a}, session limit = {limit}.".format(a=self.current_time - self.start_time, limit=self.session_duration))
+                    logging.debug("Returning FAIL from DurationCheck - time limit not yet reached, current time = %s", self.current_time)
                 return NodeStatus(NodeStatus.FAIL, "Time limit not yet reached.")
             else:
                 if not config.session_stop_utterance_given:
@@ -1805,13 +1855,9 @@ class DurationCheck(Node):
                     phase = "non-exercise"
 
                     utteranceURL = config.screen_post_address + utterance + "/" + phase + "/end/newUtterance"
-                    r = requests.post(utteranceURL)
-                    # Send post request to Pepper
-                    r = requests.post(config.post_address, json=output)
-
-                    # Wait for response before continuing because the session might be paused.
-                    while r.status_code is None:
-                        time.sleep(0.2)
+                    _post_to_screen(utteranceURL)
+                    # Send post request to Pepper. Blocks until the robot responds because the session might be paused.
+                    _session.post(config.post_address, json=output)
 
                     config.session_stop_utterance_given = True
 
@@ -1819,18 +1865,16 @@ class DurationCheck(Node):
                     config.stop_set = False
                     config.stop_session = False
                     config.tidying = False
-                    logging.debug("Session time limit reached, current duration = {a}, session limit = {limit}.".format(
-                        a=session_duration_delta, limit=config.MAX_SESSION_TIME))
-                    logging.info("Session time limit reached, current duration = {a}, session limit = {limit}.".format(
-                        a=self.current_time - self.start_time, limit=self.session_duration))
-                    logging.debug("Returning SUCCESS from DurationCheck - Time limit reached, current time = " + str(self.current_time))
+                    logging.debug("Session time limit reached, current duration = %s, session limit = %s.", session_duration_delta, config.MAX_SESSION_TIME)
+                    logging.info("Session time limit reached, current duration = %s, session limit = %s.", self.current_time - self.start_time, self.session_duration)
+                    logging.debug("Returning SUCCESS from DurationCheck - Time limit reached, current time = %s", self.current_time)
                     return NodeStatus(NodeStatus.SUCCESS, "Session time limit reached.")
                 else:
-                    logging.debug("Setting config.tidying to True")
+                    if not config.tidying:
+                        logging.debug("Setting config.tidying to True")
+                        logging.debug("Session time limit reached, tidying up, current duration = %s, session limit = %s.", session_duration_delta, config.MAX_SESSION_TIME)
                     config.tidying = True
                     # config.stop_session = True
-                    logging.debug("Session time limit reached, tidying up, current duration = {a}, session limit = {limit}.".format(
-                        a=session_duration_delta, limit=config.MAX_SESSION_TIME))
                     return NodeStatus(NodeStatus.FAIL, "Tidying up.")
         else:
             return NodeStatus(NodeStatus.FAIL, "Stop set duration check")
@@ -1862,7 +1906,7 @@ class GetChoice(Node):
             *args, **kwargs)
 
     def configure(self, nodedata):
-        logging.debug("Configuring GetChoice: " + self._name)
+        logging.debug("Configuring GetChoice: %s", self._name)
         self.choice_type = nodedata.get_data('choice_type')
         self.whos_choice = nodedata.get_data('whos_choice')
         self.sorted_shot_list = nodedata.get_data('shot_list')
@@ -1879,15 +1923,15 @@ class GetChoice(Node):
                 if self.choice_type == config.SHOT_CHOICE:
                     s = 0
                     shot = self.sorted_shot_list[s]
-                    logging.debug("trying to select shot: " + str(shot))
-                    logging.debug("used shots = " + str(config.used_shots))
+                    logging.debug("trying to select shot: %s", shot)
+                    logging.debug("used shots = %s", config.used_shots)
                     while shot in config.used_shots:
                         s += 1
                         shot = self.sorted_shot_list[s]
-                        logging.debug("trying to select shot:" + str(shot))
+                        logging.debug("trying to select shot:%s", shot)
 
                     # config.used_shots.append(shot)
-                    logging.debug("chosen shot: " + shot + ", used shots = " + str(config.used_shots))
+                    logging.debug("chosen shot: %s, used shots = %s", shot, config.used_shots)
                     #config.performance = None
                     #config.score = -1
 
@@ -1909,13 +1953,13 @@ class GetChoice(Node):
                     config.shot = nodedata.shot
                     config.hand = nodedata.hand
 
-                    logging.info("System has chosen a new shot: Hand = " + str(config.hand) + ", shot = " + str(config.shot))
+                    logging.info("System has chosen a new shot: Hand = %s, shot = %s", config.hand, config.shot)
 
-                    logging.debug("Returning SUCCESS from GetUserChoice, shot = " + str(nodedata.hand) + " " + str(nodedata.shot))
+                    logging.debug("Returning SUCCESS from GetUserChoice, shot = %s %s", nodedata.hand, nodedata.shot)
                     return NodeStatus(NodeStatus.SUCCESS,"Returning SUCCESS from GetUserChoice, shot = " + str(nodedata.hand) + " " + str(nodedata.shot))
                 else:  # STAT_CHOICE
                     stat = min(config.stat_list, key=config.stat_list.get)
-                    logging.debug("stat choice = " + str(stat) + ", used_stats = " + str(config.used_stats))
+                    logging.debug("stat choice = %s, used_stats = %s", stat, config.used_stats)
                     tempStatList = config.stat_list
                     while stat in config.used_stats:
                         tempStatList.pop(stat)
@@ -1924,9 +1968,9 @@ class GetChoice(Node):
                     # config.used_stats.append(stat)
                     #config.performance = None
                     #config.score = -1
-                    logging.debug("config.metric_score_list = " + str(config.metric_score_list))
-                    logging.debug("config.target_list = " + str(config.targetList))
-                    logging.debug("config.metric_performance_list = " + str(config.metric_performance_list))
+                    logging.debug("config.metric_score_list = %s", config.metric_score_list)
+                    logging.debug("config.target_list = %s", config.targetList)
+                    logging.debug("config.metric_performance_list = %s", config.metric_performance_list)
                     nodedata.stat = stat
                     config.stat = stat
                     config.score = config.metric_score_list[stat]
@@ -1935,9 +1979,9 @@ class GetChoice(Node):
                         config.performance = config.metric_performance_list[stat]
                     else:
                         config.performance = None
-                    logging.info("System has chosen a new swing metric: " + str(config.stat))
+                    logging.info("System has chosen a new swing metric: %s", config.stat)
                     config.set_count = 0  # Reset the set count for this session to 0.
-                    logging.debug("Returning SUCCESS from GetUserChoice, stat = " + str(nodedata.stat))
+                    logging.debug("Returning SUCCESS from GetUserChoice, stat = %s", nodedata.stat)
                     return NodeStatus(NodeStatus.SUCCESS,"Returning SUCCESS from GetUserChoice, stat = " + str(nodedata.stat))
             else:  # CHOICE_BY_PERSON
                 if self.choice_type == config.SHOT_CHOICE:
@@ -1950,9 +1994,8 @@ class GetChoice(Node):
                     # config.used_shots.append(str(config.hand) + str(config.shot))
                     #config.performance = None
                     #config.score = -1
-                    logging.info("Player has chosen a new shot: Hand = " + str(config.hand) + ", shot = " + str(config.shot))
-                    logging.debug("Returning SUCCESS from GetUserChoice, shot = " + str(nodedata.hand) + " " + str(nodedata.shot))
-                    logging.debug("Returning SUCCESS from GetUserChoice, shot = " + str(nodedata.hand) + " " + str(nodedata.shot))
+                    logging.info("Player has chosen a new shot: Hand = %s, shot = %s", config.hand, config.shot)
+                    logging.debug("Returning SUCCESS from GetUserChoice, shot = %s %s", nodedata.hand, nodedata.shot)
                     return NodeStatus(NodeStatus.SUCCESS, "Returning SUCCESS from GetUserChoice, shot = " + str(nodedata.hand) + " " + str(nodedata.shot))
                 else:  # STAT_CHOICE
                     if config.stat is None:
@@ -1960,19 +2003,19 @@ class GetChoice(Node):
 
                     nodedata.stat = config.stat
                     # config.used_stats.append(config.stat)
-                    logging.debug("config.metric_score_list = " + str(config.metric_score_list))
-                    logging.debug("config.target_list = " + str(config.targetList))
-                    logging.debug("config.metric_performance_list = " + str(config.metric_performance_list))
+                    logging.debug("config.metric_score_list = %s", config.metric_score_list)
+                    logging.debug("config.target_list = %s", config.targetList)
+                    logging.debug("config.metric_performance_list = %s", config.metric_performance_list)
                     config.score = config.metric_score_list[config.stat]
                     config.target = config.targetList[config.stat]
                     if len(config.metric_performance_list) > 0:
                         config.performance = config.metric_performance_list[config.stat]
                     else:
                         config.performance = None
-                    logging.info("Person has chosen a new swing metric: " + str(config.stat))
+                    logging.info("Person has chosen a new swing metric: %s", config.stat)
                     #config.performance = None
                     #config.score = -1
-                    logging.debug("Returning SUCCESS from GetUserChoice, stat = " + str(nodedata.stat))
+                    logging.debug("Returning SUCCESS from GetUserChoice, stat = %s", nodedata.stat)
                     return NodeStatus(NodeStatus.SUCCESS, "Returning SUCCESS from GetUserChoice, stat = " + str(nodedata.stat))
         else:
             if config.stop_session_on_baseline:
@@ -2000,9 +2043,10 @@ class EndSetEvent(Node):
             *args, **kwargs)
 
     def configure(self, nodedata):
-        logging.debug("Configuring EndSetEvent: " + self._name + ", setting shotcount to " + str(config.shot_count))
+        logging.debug("Configuring EndSetEvent: %s, setting shotcount to %s", self._name, config.shot_count)
         self.shotcount = config.shot_count
-        self.firstTime = config.set_count == 0
+        # The shot count is fixed until the node is configured again, so only the stop flags need checking each tick.
+        self.enough_shots = self.shotcount >= config.SHOTS_PER_SET
 
     def run(self, nodedata):
         """
@@ -2014,10 +2058,10 @@ class EndSetEvent(Node):
         # self.shotcount += 1  # TODO Set this to 0 when set starts.
 
         if config.stop_on_baseline or config.stop_session_on_baseline:
-            logging.debug("config.stat_list = " + str(config.stat_list))
+            logging.debug("config.stat_list = %s", config.stat_list)
             if config.stat_list:
-                logging.info("Policy = " + str(config.policy_matrix.get_matrix()))
-                logging.info("Cumulative reward = " + str(config.cumulative_reward))
+                logging.info("Policy = %s", config.policy_matrix.get_matrix())
+                logging.info("Cumulative reward = %s", config.cumulative_reward)
                 config.stop_set = True
                 config.goal_level = config.EXERCISE_GOAL
                 if config.stop_session_on_baseline:
@@ -2036,20 +2080,17 @@ class EndSetEvent(Node):
                 config.stop_on_baseline = False
                 # config.stop_session_on_baseline = False
 
-                output = {
-                    "stop": str(1)
-                }
                 # logging.info("Stopping set.")
-                r = requests.post(config.post_address, json=output)
+                _session.post(config.post_address, json=_STOP_OUTPUT)
 
                 logging.info("Shot set completed.")
-                logging.debug("Returning SUCCESS from EndSetEvent, shot count = " + str(self.shotcount) + "stat_list not empty")
+                logging.debug("Returning SUCCESS from EndSetEvent, shot count = %sstat_list not empty", self.shotcount)
                 return NodeStatus(NodeStatus.SUCCESS, "Shot set ended.")
             else:
-                logging.debug("Returning FAIL from EndSetEvent, shot count = " + str(self.shotcount) + ", stopped on Baseline")
+                logging.debug("Returning FAIL from EndSetEvent, shot count = %s, stopped on Baseline", self.shotcount)
                 return NodeStatus(NodeStatus.FAIL, "Shot set at " + str(self.shotcount) + ". Not ended yet.")
 
-        if self.shotcount >= config.SHOTS_PER_SET or config.stop_set or config.stop_session:
+        if self.enough_shots or config.stop_set or config.stop_session:
             config.expecting_action_goal = False
             # config.completed = config.COMPLETED_STATUS_TRUE
             config.set_count += 1
@@ -2058,17 +2099,14 @@ class EndSetEvent(Node):
             config.stop_set = False  # Ending set so reset this variable so the session can continue.
             config.getBehaviourGoalLevel = 4
 
-            output = {
-                "stop": str(1)
-            }
             # logging.info("Stopping set: That's 30, you can stop there.")
-            r = requests.post(config.post_address, json=output)
+            _session.post(config.post_address, json=_STOP_OUTPUT)
 
             logging.info("Shot set completed.")
-            logging.debug("Returning SUCCESS from EndSetEvent, shot count = " + str(self.shotcount))
+            logging.debug("Returning SUCCESS from EndSetEvent, shot count = %s", self.shotcount)
             return NodeStatus(NodeStatus.SUCCESS, "Shot set ended.")
         else:
-            logging.debug("Returning FAIL from EndSetEvent, shot count = " + str(self.shotcount))
+            logging.debug("Returning FAIL from EndSetEvent, shot count = %s", self.shotcount)
             return NodeStatus(NodeStatus.FAIL, "Shot set at " + str(self.shotcount) + ". Not ended yet.")
 
 class InitialiseBlackboard(Node):
@@ -2106,7 +2144,7 @@ class InitialiseBlackboard(Node):
             state information.
         :return: None
         """
-        logging.debug("Configuring InitialiseBlackboard: " + self._name)
+        logging.debug("Configuring InitialiseBlackboard: %s", self._name)
         self.name = nodedata.get_data('name')
         self.motivation = nodedata.get_data('motivation')
         self.ability = nodedata.get_data('player_ability')
@@ -2126,27 +2164,16 @@ class InitialiseBlackboard(Node):
 
         logging.info("Initialising blackboard.")
 
-        belief_distribution = []
         # TODO: Not sure I need this anymore because the environment will deal with the policy selection.
         if config.policy == -1:
-            belief_distribution = [0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0] if self.experience == "high" else [0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0]
+            chosen_style = 3 if self.experience == "high" else 8
         else:
-            for i in range(12):
-                if config.policy == i:
-                    belief_distribution.append(1)
-                else:
-                    belief_distribution.append(0)
+            chosen_style = config.policy
+        belief_distribution = [1 if i == chosen_style else 0 for i in range(12)]
         # belief_distribution = [x / 100 for x in self._constrainedSumSamplePos(12, 100, 0.001)]
         nodedata.belief = belief_distribution
 
-        style = 0
-        max_style = 0
-        max_belief = 0.0
-        for b in belief_distribution:
-            if b > max_belief:
-                max_belief = b
-                max_style = style
-            style += 1
+        max_style = int(np.argmax(belief_distribution))
 
         nodedata.state = self._get_start(max_style)
         nodedata.performance = -1
@@ -2168,12 +2195,12 @@ class InitialiseBlackboard(Node):
         for shot in config.shot_list_master:
             for hand in ["FH", "BH"]:
                 try:
-                    f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + hand + shot + "/Aggregator.txt", "r")
+                    f = open(config.session_data_path + config.participantNo + "/" + hand + shot + "/Aggregator.txt", "r")
                     aggregator_contents = f.readlines()
                     f.close()
 
                     score = float(aggregator_contents[0])
-                except:
+                except (FileNotFoundError, IndexError, ValueError):
                     score = 2.5
                 # Assign a score to each shot based on the importance of the shot (taken from racketware) and data
                 # about the previous user performance for each shot. Shots that the user has done really well on in the
@@ -2185,7 +2212,7 @@ class InitialiseBlackboard(Node):
         for i in sorted_shot_set:
             sorted_shot_list.append(i[0])
         sorted_shot_list.reverse()  # Reverse to get most important shot first.
-        logging.debug("InitialiseBlackboard, sorted shot list = " + str(sorted_shot_list))
+        logging.debug("InitialiseBlackboard, sorted shot list = %s", sorted_shot_list)
 
         nodedata.sorted_shot_list = sorted_shot_list
 
@@ -2202,31 +2229,11 @@ class InitialiseBlackboard(Node):
         dividers = sorted(random.sample(range, n - 1))
         return [a - b for a, b in zip(dividers + [total], [0.0] + dividers)]
 
-    def _get_start(self, style):
-        if style == 0:
-            return 0
-        elif style == 1:
-            return 45
-        elif style == 2:
-            return 90
-        elif style == 3:
-            return 135
-        elif style == 4:
-            return 180
-        elif style == 5:
-            return 225
-        elif style == 6:
-            return 270
-        elif style == 7:
-            return 323
-        elif style == 8:
-            return 376
-        elif style == 9:
-            return 429
-        elif style == 10:
-            return 482
-        else:
-            return 535
+    @staticmethod
+    def _get_start(style):
+        if 0 <= style < len(_STYLE_START_STATES):
+            return _STYLE_START_STATES[style]
+        return _STYLE_START_STATES[-1]
 
 
 class OverrideOption(Node):
@@ -2255,7 +2262,7 @@ class OverrideOption(Node):
             state information.
         :return: None
         """
-        logging.debug("Configuring OverrideOption " + self._name)
+        logging.debug("Configuring OverrideOption %s", self._name)
         self.original_behaviour = nodedata.get_data("original_behaviour")
 
     def run(self, nodedata):
@@ -2272,10 +2279,10 @@ class OverrideOption(Node):
             else:
                 if config.override:
                     # config.overriden = True
-                    if self.original_behaviour == config.A_PREINSTRUCTION:
-                        config.behaviour = config.A_QUESTIONING
+                    if self.original_behaviour == A_PREINSTRUCTION:
+                        config.behaviour = A_QUESTIONING
                     else:
-                        config.behaviour = config.A_PREINSTRUCTION
+                        config.behaviour = A_PREINSTRUCTION
 
                     config.override = None
                     config.need_new_behaviour = False
@@ -2318,7 +2325,7 @@ class CheckDoneBefore(Node):
             state information.
         :return: None
         """
-        logging.debug("Configuring CheckDoneBefore " + self._name)
+        logging.debug("Configuring CheckDoneBefore %s", self._name)
         self.shot = nodedata.get_data("shot")
         self.hand = nodedata.get_data("hand")
 
@@ -2333,16 +2340,14 @@ class CheckDoneBefore(Node):
 
         if not config.stop_set and not config.stop_session:
             try:
-                f = open("/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + config.hand + str(config.shot) + "/Baseline.txt", "r")
-                f_contents = f.readlines()
-                f.close()
+                f_contents = _read_history(config.session_data_path + config.participantNo + "/" + config.hand + str(config.shot) + "/Baseline.txt")
 
                 if config.stat_count > 0:
                     logging.debug("Returning SUCCESS from CheckDoneBefore, Found file containing this exercise and stat_count > 0")
                     return NodeStatus(NodeStatus.SUCCESS, "Found file containing this exercise.")
                 else:
                     # folder path
-                    dir_path = "/home/martin/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/" + config.hand + str(
+                    dir_path = config.session_data_path + config.participantNo + "/" + config.hand + str(
                         config.shot)
                     fileCount = 0
                     # Iterate directory
@@ -2352,8 +2357,7 @@ class CheckDoneBefore(Node):
                             fileCount += 1
                     required_length = 1 + (fileCount - 2) * 12
                     logging.debug("Checking done before.")
-                    logging.debug("required_length = " + str(required_length) + ", len(f_contents) = " + str(
-                        len(f_contents)))  # + ", f_contents[required_length = " + f_contents[required_length])
+                    logging.debug("required_length = %s, len(f_contents) = %s", required_length, len(f_contents))  # + ", f_contents[required_length = " + f_contents[required_length])
 
                     if len(f_contents) >= required_length and f_contents[required_length] != "0\n":
                         logging.debug("Returning SUCCESS from CheckDoneBefore")
@@ -2373,7 +2377,7 @@ class CheckDoneBefore(Node):
                 else:
                     logging.debug("Returning FAIL from CheckDoneBefore: found file but not long enough")
                     return NodeStatus(NodeStatus.FAIL, "Failed to find file containing this exercise.")'''
-            except:
+            except (FileNotFoundError, IndexError):
                 if config.stat_count > 0:  # If we've already worked on it today, the file won't be there yet but we don't need to do baseline goal.
                     logging.debug("Returning SUCCESS from CheckDoneBefore, more than one stat worked on today.")
                     return NodeStatus(NodeStatus.SUCCESS, "Found file containing this exercise.")
@@ -2409,7 +2413,7 @@ class CheckCreated(Node):
             state information.
         :return: None
         """
-        logging.debug("Configuring CheckCreated " + self._name)
+        logging.debug("Configuring CheckCreated %s", self._name)
         self.check_goal = nodedata.get_data('check_goal')
         # self.goal = nodedata.get_data('goal_level')
 
@@ -2420,7 +2424,7 @@ class CheckCreated(Node):
          NodeStatus.FAIL if otherwise.
         """
 
-        logging.debug("check_goal = " + str(self.check_goal) + ", goal = " + str(config.getBehaviourGoalLevel))
+        logging.debug("check_goal = %s, goal = %s", self.check_goal, config.getBehaviourGoalLevel)
         if not config.stop_set and not config.stop_session:
             if config.getBehaviourGoalLevel == self.check_goal:
                 if self.check_goal == config.SESSION_GOAL:
@@ -2469,7 +2473,7 @@ class StopCheck(Node):
             state information.
         :return: None
         """
-        logging.debug("Configuring StopCheck " + self._name)
+        logging.debug("Configuring StopCheck %s", self._name)
         self.start_time = nodedata.get_data('start_time')
 
     def run(self, nodedata):
@@ -59,7 +59,7 @@ class CoachingEnvironment(gym.Env, ABC):
             matrix = ast.literal_eval(contents[0][:-1])
             try:
                 f = open(
-                    "~/PycharmProjects/coachingPolicies/SessionDataFiles/" + config.participantNo + "/Sessions.txt",
+                    config.session_data_path + config.participantNo + "/Sessions.txt",
                     "r")
                 file_contents = f.readlines()
                 f.close()
@@ -126,12 +126,18 @@ class CoachingEnvironment(gym.Env, ABC):
 
         logging.debug("config.behaviour = " + str(config.behaviour))
         while not config.need_new_behaviour:  # Keep ticking the tree until a behaviour is given by the robot. This is the point the controller can select a new action and learn.
+            config.waiting_for_guide = False  # Only wait if a timestep cue in this tick is still waiting on the guide.
             result = self.coaching_tree.tick()
             if config.behaviour_displayed:
                 logging.debug("Tree ticked, not returning: " + str(result))
             else:
                 logging.debug("Tree ticked, returning: " + str(result))
             logging.debug(result)
+            if config.waiting_for_guide:
+                # Nothing will change until the guide posts new data, so don't tick again until it does (or shortly
+                # after, in case the cue comes from somewhere other than the API).
+                if config.guide_update.wait(config.GUIDE_POLL_INTERVAL):
+                    config.guide_update.clear()
 
         observation = self.policy.get_observation(state, action)
         reward = self._calculate_reward(action, observation, config.score, config.target, config.performance)
@@ -1,4 +1,5 @@
 import logging
+from itertools import accumulate
 
 import numpy as np
 import random
@@ -26,11 +27,20 @@ class Policy:
         The distribution across styles used to sample an observation.
     transition_matrix :type list[list[list[float]]]
         The transition matrix generated from the IRL rewards.
+    _cum_weights :type dict
+        Cumulative weights of each transition matrix row already sampled from, keyed by state. Cleared by update().
+    _valid_weights :type dict
+        Valid actions and their cumulative weights for each state, keyed by (valid_actions, epsilon) within each state.
+        Cleared by update().
 
     Methods
     -------
     sample_action(state)
         Generate a behaviour based on the transition matrix distribution.
+    sample_valid_action(state, valid_actions)
+        Generate a behaviour from the same distribution as sample_action(), restricted to the given valid behaviours.
+    _get_valid_weights(state, valid_actions)
+        Work out the probability sample_action() gives each valid action from state.
     sample_observation(state, action)
         Decide whether to move style based on self.belief_distribution and selected action (if it is possible in other
         styles).
@@ -38,6 +48,8 @@ class Policy:
         Get the action associated with the given state.
     _get_style(state)
         Get the style associated with the given state.
+    _get_cum_weights(state)
+        Get the cumulative weights of a transition matrix row, computing them on first use.
     _get_transition_matrix()
         Generate the transition matrix based on the IRL rewards.
     _get_prob_matrix_from_reward(style)
@@ -51,6 +63,8 @@ class Policy:
         elif policy is not None:
             self.transition_matrix = policy
         self.E = [[0 for i in range(len(self.transition_matrix[0]))] for j in range(len(self.transition_matrix))]
+        self._cum_weights = {}
+        self._valid_weights = {}
 
     '''        # ACTIONS
     A_START = 0
@@ -287,22 +301,24 @@ class Policy:
             action = random.randint(1, 67)
         else:
             logging.info("exploiting")
-            logging.debug("transition matrix = " + str(self.transition_matrix))
-            logging.info("state = " + str(state))
-            if sum(self.transition_matrix[state]) > 0.0:
-                choicess = choices(range(69), self.transition_matrix[state])
-                logging.debug("choices = " + str(choicess))
+            logging.debug("transition matrix = %s", self.transition_matrix)
+            logging.info("state = %s", state)
+            # The last cumulative weight is the row total, so it doubles as the check for an empty row.
+            cum_weights = self._get_cum_weights(state)
+            if cum_weights[-1] > 0.0:
+                choicess = choices(range(69), cum_weights=cum_weights)
+                logging.debug("choices = %s", choicess)
                 action = choicess[0]
-                logging.debug("action: " + str(action))
+                logging.debug("action: %s", action)
                 count = 1
                 while action == config.A_MANUALMANIPULATION:
                     # Manual manipulation is not possible for the robot so if this is the case, get new behaviour
                     if count <= 10:  # Either from original state
                         logging.debug("count <= 10")
-                        action = choices(range(69), self.transition_matrix[state])[0]
+                        action = choices(range(69), cum_weights=cum_weights)[0]
                     else:  # or from manual manipulation if this is the only behaviour following the original state.
                         logging.debug("count > 10")
-                        action = choices(range(69), self.transition_matrix[state])[0]
+                        action = choices(range(69), cum_weights=cum_weights)[0]
                     count += 1
 
                 # Special case when action == 44 (A_END) for coach styles.
@@ -314,6 +330,55 @@ class Policy:
 
         return action  # choices(range(68), self.transition_matrix[style - 1][self._get_action(state)])[0]
 
+    def sample_valid_action(self, state, valid_actions):
+        """
+        Generate a behaviour from the same distribution as sample_action(), restricted to the given valid behaviours.
+        Equivalent to calling sample_action() until it returns a valid behaviour, but with a single draw.
+        :param state :type int: the state last observed by the policy.
+        :param valid_actions :type frozenset[int]: the behaviours which are valid in the current interaction state.
+        :return:type int: a random valid action, or None if none of the valid actions can be generated from state.
+        """
+        state_weights = self._valid_weights.setdefault(state, {})
+        key = (valid_actions, config.epsilon)
+        if key not in state_weights:
+            state_weights[key] = self._get_valid_weights(state, valid_actions)
+        actions, cum_weights = state_weights[key]
+
+        if not actions:
+            logging.debug("no valid actions can be generated from state %s", state)
+            return None
+        action = choices(actions, cum_weights=cum_weights)[0]
+        logging.debug("valid action: %s", action)
+        return action
+
+    def _get_valid_weights(self, state, valid_actions):
+        """
+        Work out the probability sample_action() gives each valid action from state.
+        :param state :type int: the state last observed by the policy.
+        :param valid_actions :type frozenset[int]: the behaviours which are valid in the current interaction state.
+        :return:type tuple(list[int], list[float]): the valid actions which can be generated from state and their
+            cumulative weights.
+        """
+        epsilon = min(max(config.epsilon, 0.0), 1.0)
+        explore_weight = epsilon / 67  # sample_action() explores uniformly over actions 1 to 67.
+
+        # Exploiting never returns manual manipulation, so its weight is spread over the rest of the row.
+        row = self.transition_matrix[state]
+        row_total = self._get_cum_weights(state)[-1] - row[config.A_MANUALMANIPULATION]
+        exploit_scale = (1.0 - epsilon) / row_total if row_total > 0.0 else 0.0
+
+        actions = []
+        weights = []
+        for action in valid_actions:
+            weight = explore_weight if 1 <= action <= 67 else 0.0
+            if action != config.A_MANUALMANIPULATION:
+                weight += exploit_scale * row[action]
+            if weight > 0.0:
+                actions.append(action)
+                weights.append(weight)
+
+        return actions, list(accumulate(weights))
+
     def sample_observation(self, state, action):
         """
         Get the observation given the action. Based on belief_distribution in case we need to change style but at the
@@ -372,6 +437,17 @@ class Policy:
             else:
                 return state % 45
 
+    def _get_cum_weights(self, state):
+        """
+        Get the cumulative weights of a transition matrix row, computing them on first use.
+        :param state :type int: the state whose row of the transition matrix we want to sample from.
+        :return:type list[float]: the running totals of the row, the last of which is the sum of the row.
+        """
+        cum_weights = self._cum_weights.get(state)
+        if cum_weights is None:
+            cum_weights = self._cum_weights[state] = list(accumulate(self.transition_matrix[state]))
+        return cum_weights
+
     @staticmethod
     def _get_style(state):
         """
@@ -2439,31 +2515,27 @@ class Policy:
                   0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]],
         }
 
-        tm = [[[0.0 for x in range(69)] for y in range(69)] for z in range(12)]
-        for count in range(12):
-            if count < 6:
-                for row in range(69):
-                    if row < 45:
-                        for col in range(69):
-                            if col < 45:
-                                if row == 44 and not(col == 44):  # A_END cases
-                                    tm[count][67][col] = switcher[count][row][col]
-                                elif not(row == 44) and col == 44:
-                                    tm[count][row][67] = switcher[count][row][col]
-                                elif row == 44 and col == 44:
-                                    tm[count][67][67] = switcher[count][row][col]
-                                else:  # Normal case
-                                    tm[count][row][col] = switcher[count][row][col]
-            else:
-                for row in range(68):
-                    if row < 53:
-                        for col in range(68):
-                            if col < 53:
-                                tm[count][self.physioActionDict[row]][self.physioActionDict[col]] = switcher[count][row][col]
-            count += 1
+        # Only the matrix associated with the chosen policy according to our belief distribution is returned, so pick
+        # the style first and only expand that one into the full 69 x 69 action space.
+        style = choices(range(1, 13), self.belief_distribution)[0]
+        tm = [[0.0 for x in range(69)] for y in range(69)]
+        if style < 6:
+            for row in range(45):
+                for col in range(45):
+                    if row == 44 and not(col == 44):  # A_END cases
+                        tm[67][col] = switcher[style][row][col]
+                    elif not(row == 44) and col == 44:
+                        tm[row][67] = switcher[style][row][col]
+                    elif row == 44 and col == 44:
+                        tm[67][67] = switcher[style][row][col]
+                    else:  # Normal case
+                        tm[row][col] = switcher[style][row][col]
+        else:
+            for row in range(53):
+                for col in range(53):
+                    tm[self.physioActionDict[row]][self.physioActionDict[col]] = switcher[style][row][col]
 
-        # Return only the matrix associated with the chosen policy according to our belief distribution.
-        return tm[choices(range(1, 13), self.belief_distribution)[0]]
+        return tm
 
     def get_matrix(self):
         return self.transition_matrix
@@ -2476,6 +2548,8 @@ class Policy:
         # f = open(filename, "w")
         # f.write(str(self.transition_matrix[state][action]) + "\n")
         self.transition_matrix[state][action] = updatedValue
+        self._cum_weights.pop(state, None)
+        self._valid_weights.pop(state, None)
         # f.write(str(self.transition_matrix[state][action]) + "\n")
         # f.write(str(state) + "\n")
         # f.write(str(action) + "\n")
@@ -1,9 +1,211 @@
+import itertools
 import logging
 
 from CoachingBehaviourTree import config
+from CoachingBehaviourTree.config import ACTION_GOAL, PERSON_GOAL, PHASE_END, A_END, A_START, A_SILENCE
 from Policy.policy import Policy
 
 
+def _build_valid_list(goal_level, performance, phase):
+    """
+    Create the list of valid behaviours for a single state of interaction. Used to fill _VALID.
+    :param goal_level :type int: the current goal level of the interaction.
+    :param performance :type int: the performance of the user on their last action.
+    :param phase :type int: the phase of the current goal level (either intro or feedback).
+    :return valid_list :type list[int]: a list of valid behaviours in the current interaction state.
+    """
+    valid_list = []
+
+    # Person Goal
+    if goal_level == config.PERSON_GOAL:
+        if phase == config.PHASE_START:
+            valid_list.extend([config.A_PREINSTRUCTION, config.A_PREINSTRUCTION_FIRSTNAME])
+        else:
+            valid_list.append(config.A_END)
+
+    # Baseline Goal
+    elif goal_level == config.BASELINE_GOAL:
+        if phase == config.PHASE_START:
+            valid_list.extend([config.A_PREINSTRUCTION, config.A_PREINSTRUCTION_QUESTIONING,
+                               config.A_PREINSTRUCTION_FIRSTNAME,
+                               config.A_PREINSTRUCTION_POSITIVEMODELING,
+                               config.A_POSITIVEMODELING_PREINSTRUCTION])
+        else:
+            valid_list.append(config.A_PRAISE)
+
+    # Session, Exercise and Set Goals will all have the same action categories (different individual actions)
+    elif goal_level == config.SESSION_GOAL or goal_level == config.EXERCISE_GOAL or goal_level == config.STAT_GOAL or goal_level == config.SET_GOAL:
+        valid_list.extend([config.A_POSTINSTRUCTIONPOSITIVE, config.A_POSTINSTRUCTIONNEGATIVE,
+                           config.A_QUESTIONING, config.A_POSTINSTRUCTIONPOSITIVE_QUESTIONING,
+                           config.A_POSTINSTRUCTIONPOSITIVE_FIRSTNAME,
+                           config.A_POSTINSTRUCTIONNEGATIVE_QUESTIONING, config.A_QUESTIONING_FIRSTNAME,
+                           config.A_POSTINSTRUCTIONNEGATIVE_FIRSTNAME])
+        if goal_level == config.EXERCISE_GOAL or goal_level == config.STAT_GOAL or goal_level == config.SET_GOAL:
+            valid_list.extend([config.A_QUESTIONING_POSITIVEMODELING, config.A_POSITIVEMODELING_QUESTIONING,
+                               config.A_POSTINSTRUCTIONPOSITIVE_POSITIVE_MODELING,
+                               config.A_POSTINSTRUCTIONPOSITIVE_NEGATIVE_MODELING,
+                               config.A_POSTINSTRUCTIONNEGATIVE_POSITIVEMODELING,
+                               config.A_POSTINSTRUCTIONNEGATIVE_NEGATIVEMODELING,
+                               config.A_QUESTIONING_NEGATIVEMODELING,
+                               config.A_POSITIVEMODELING_POSTINSTRUCTIONPOSITIVE,
+                               config.A_NEGATIVEMODELING_POSTINSTRUCTIONNEGATIVE])
+        if phase == config.PHASE_START:
+            valid_list.extend([config.A_PREINSTRUCTION, config.A_PREINSTRUCTION_QUESTIONING,
+                               config.A_PREINSTRUCTION_FIRSTNAME])
+            if goal_level == config.EXERCISE_GOAL or goal_level == config.STAT_GOAL or goal_level == config.SET_GOAL:
+                valid_list.extend([config.A_PREINSTRUCTION_POSITIVEMODELING,
+                                   config.A_PREINSTRUCTION_NEGATIVEMODELING,
+                                   config.A_POSITIVEMODELING_PREINSTRUCTION])
+            if performance == config.MET:
+                valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME])
+                if goal_level == config.EXERCISE_GOAL or goal_level == config.STAT_GOAL or goal_level == config.SET_GOAL:
+                    valid_list.extend(([config.A_POSITIVEMODELING_PRAISE]))
+            elif performance == config.MUCH_IMPROVED:
+                valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME])
+                if goal_level == config.EXERCISE_GOAL or goal_level == config.STAT_GOAL or goal_level == config.SET_GOAL:
+                    valid_list.extend(([config.A_POSITIVEMODELING_PRAISE]))
+            elif performance == config.IMPROVED:
+                valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME])
+                if goal_level == config.EXERCISE_GOAL or goal_level == config.STAT_GOAL or goal_level == config.SET_GOAL:
+                    valid_list.extend(([config.A_POSITIVEMODELING_PRAISE]))
+            elif performance == config.IMPROVED_SWAP:
+                valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME])
+                if goal_level == config.EXERCISE_GOAL or goal_level == config.STAT_GOAL or goal_level == config.SET_GOAL:
+                    valid_list.extend(([config.A_POSITIVEMODELING_PRAISE]))
+            elif performance == config.STEADY:
+                valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME])
+                if goal_level == config.EXERCISE_GOAL or goal_level == config.STAT_GOAL or goal_level == config.SET_GOAL:
+                    valid_list.extend(([config.A_POSITIVEMODELING_PRAISE]))
+            elif performance == config.REGRESSED:
+                valid_list.extend([config.A_SCOLD, config.A_CONSOLE, config.A_SCOLD_FIRSTNAME,
+                                   config.A_CONSOLE_FIRSTNAME])
+            elif performance == config.REGRESSED_SWAP:
+                valid_list.extend([config.A_SCOLD, config.A_CONSOLE, config.A_SCOLD_FIRSTNAME,
+                                   config.A_CONSOLE_FIRSTNAME])
+            elif performance == config.MUCH_REGRESSED:  # performance == config.MUCH_REGRESSED
+                valid_list.extend([config.A_SCOLD, config.A_CONSOLE, config.A_SCOLD_FIRSTNAME,
+                                   config.A_CONSOLE_FIRSTNAME])
+        else:  # phase == config.PHASE_END
+            if goal_level == config.SESSION_GOAL:
+                valid_list.append(config.A_END)
+            if performance == config.MET:
+                valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME,
+                                   config.A_POSITIVEMODELING_PRAISE])
+            elif performance == config.MUCH_IMPROVED:
+                valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME,
+                                   config.A_POSITIVEMODELING_PRAISE])
+            elif performance == config.IMPROVED:
+                valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME,
+                                   config.A_POSITIVEMODELING_PRAISE])
+            elif performance == config.IMPROVED_SWAP:
+                valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME,
+                                   config.A_POSITIVEMODELING_PRAISE])
+            elif performance == config.STEADY:
+                valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME,
+                                   config.A_POSITIVEMODELING_PRAISE])
+            elif performance == config.REGRESSED:
+                valid_list.extend([config.A_SCOLD, config.A_CONSOLE, config.A_SCOLD_FIRSTNAME,
+                                   config.A_CONSOLE_FIRSTNAME])
+            elif performance == config.REGRESSED_SWAP:
+                valid_list.extend([config.A_SCOLD, config.A_CONSOLE, config.A_SCOLD_FIRSTNAME,
+                                   config.A_CONSOLE_FIRSTNAME])
+            elif performance == config.MUCH_REGRESSED:  # performance == config.MUCH_REGRESSED
+                valid_list.extend([config.A_SCOLD, config.A_CONSOLE, config.A_SCOLD_FIRSTNAME,
+                                   config.A_CONSOLE_FIRSTNAME])
+
+    # Action Goal (each shot in squash or repetition of exercise in rehab)
+    else:  # goal_level == config.ACTION_GOAL:
+        valid_list.extend([config.A_SILENCE, config.A_CONCURRENTINSTRUCTIONPOSITIVE,
+                           config.A_QUESTIONING, config.A_POSITIVEMODELING, config.A_HUSTLE,
+                           config.A_CONCURRENTINSTRUCTIONPOSITIVE_QUESTIONING,
+                           config.A_CONCURRENTINSTRUCTIONPOSITIVE_FIRSTNAME,
+                           config.A_QUESTIONING_FIRSTNAME, config.A_HUSTLE_FIRSTNAME,
+                           config.A_CONCURRENTINSTRUCTIONPOSITIVE_POSITIVEMODELING,
+                           config.A_POSITIVEMODELING_HUSTLE,
+                           config.A_POSITIVEMODELING_CONCURRENTINSTRUCTIONPOSITIVE])
+        # No phases in action goals, just a behaviour after each shot.
+        if performance == config.MET:
+            valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME,
+                               config.A_CONCURRENTINSTRUCTIONPOSITIVE_PRAISE,
+                               config.A_POSITIVEMODELING_PRAISE])
+        elif performance == config.MUCH_IMPROVED:
+            valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME,
+                               config.A_CONCURRENTINSTRUCTIONPOSITIVE_PRAISE,
+                               config.A_POSITIVEMODELING_PRAISE])
+        elif performance == config.IMPROVED:
+            valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME,
+                               config.A_CONCURRENTINSTRUCTIONPOSITIVE_PRAISE,
+                               config.A_POSITIVEMODELING_PRAISE])
+        elif performance == config.IMPROVED_SWAP:
+            valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME,
+                               config.A_CONCURRENTINSTRUCTIONPOSITIVE_PRAISE,
+                               config.A_POSITIVEMODELING_PRAISE])
+        elif performance == config.STEADY:
+            valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME,
+                               config.A_CONCURRENTINSTRUCTIONPOSITIVE_PRAISE,
+                               config.A_POSITIVEMODELING_PRAISE])
+        elif performance == config.REGRESSED:
+            valid_list.extend([config.A_CONCURRENTINSTRUCTIONNEGATIVE, config.A_NEGATIVEMODELING,
+                               config.A_SCOLD, config.A_CONSOLE,
+                               config.A_QUESTIONING_NEGATIVEMODELING, config.A_SCOLD_POSITIVEMODELING,
+                               config.A_SCOLD_FIRSTNAME, config.A_CONSOLE_FIRSTNAME,
+                               config.A_CONCURRENTINSTRUCTIONNEGATIVE_NEGATIVEMODELING,
+                               config.A_CONCURRENTINSTRUCTIONNEGATIVE_FIRSTNAME,])
+        elif performance == config.REGRESSED_SWAP:
+            valid_list.extend([config.A_CONCURRENTINSTRUCTIONNEGATIVE, config.A_NEGATIVEMODELING,
+                               config.A_SCOLD, config.A_CONSOLE,
+                               config.A_QUESTIONING_NEGATIVEMODELING, config.A_SCOLD_POSITIVEMODELING,
+                               config.A_SCOLD_FIRSTNAME, config.A_CONSOLE_FIRSTNAME,
+                               config.A_CONCURRENTINSTRUCTIONNEGATIVE_NEGATIVEMODELING,
+                               config.A_CONCURRENTINSTRUCTIONNEGATIVE_FIRSTNAME])
+        elif performance == config.MUCH_REGRESSED:  # performance == config.MUCH_REGRESSED
+            valid_list.extend([config.A_CONCURRENTINSTRUCTIONNEGATIVE, config.A_NEGATIVEMODELING,
+                               config.A_SCOLD, config.A_CONSOLE,
+                               config.A_QUESTIONING_NEGATIVEMODELING, config.A_SCOLD_POSITIVEMODELING,
+                               config.A_SCOLD_FIRSTNAME, config.A_CONSOLE_FIRSTNAME,
+                               config.A_CONCURRENTINSTRUCTIONNEGATIVE_NEGATIVEMODELING,
+                               config.A_CONCURRENTINSTRUCTIONNEGATIVE_FIRSTNAME])
+
+    return valid_list
+
+
+def _build_valid_table():
+    """
+    Fill _VALID with the frozenset of valid behaviours for every (goal_level, performance, phase) the tree can be in.
+    :return:None
+    """
+    for key in itertools.product(range(config.PERSON_GOAL, config.BASELINE_GOAL + 1),
+                                 range(config.MET, config.MUCH_REGRESSED + 1),
+                                 (config.PHASE_START, config.PHASE_END)):
+        _VALID[key] = frozenset(_build_valid_list(*key))
+
+
+# Valid behaviours keyed by (goal_level, performance, phase), built once at import since they never change.
+_VALID = {}
+_build_valid_table()
+
+
+# Single behaviour to fall back to when a manual manipulation combination keeps being proposed in an invalid state.
+_MM_FALLBACK = {
+    config.A_MANUALMANIPULATION_QUESTIONING: config.A_QUESTIONING,
+    config.A_MANUALMANIPULATION_PREINSTRUCTION: config.A_PREINSTRUCTION,
+    config.A_PREINSTRUCTION_MANUALMANIPULATION: config.A_PREINSTRUCTION,
+    config.A_MANUALMANIPULATION_POSITIVEMODELING: config.A_POSITIVEMODELING,
+    config.A_MANUALMANIPULATION_CONCURRENTINSTRUCTIONNEGATIVE: config.A_CONCURRENTINSTRUCTIONNEGATIVE,
+    config.A_CONCURRENTINSTRUCTIONNEGATIVE_MANUALMANIPULATION: config.A_CONCURRENTINSTRUCTIONNEGATIVE,
+    config.A_MANUALMANIPULATION_CONCURRENTINSTRUCTIONPOSITIVE: config.A_CONCURRENTINSTRUCTIONPOSITIVE,
+    config.A_CONCURRENTINSTRUCTIONPOSITIVE_MANUALMANIPULATION: config.A_CONCURRENTINSTRUCTIONPOSITIVE,
+    config.A_MANUALMANIPULATION_CONSOLE: config.A_CONSOLE,
+    config.A_MANUALMANIPULATION_FIRSTNAME: config.A_FIRSTNAME,
+    config.A_MANUALMANIPULATION_HUSTLE: config.A_HUSTLE,
+    config.A_MANUALMANIPULATION_POSTINSTRUCTIONNEGATIVE: config.A_POSTINSTRUCTIONNEGATIVE,
+    config.A_POSTINSTRUCTIONNEGATIVE_MANUALMANIPULATION: config.A_POSTINSTRUCTIONNEGATIVE,
+    config.A_MANUALMANIPULATION_POSTINSTRUCTIONPOSITIVE: config.A_POSTINSTRUCTIONPOSITIVE,
+    config.A_POSTINSTRUCTIONPOSITIVE_MANUALMANIPULATION: config.A_POSTINSTRUCTIONPOSITIVE,
+    config.A_MANUALMANIPULATION_PRAISE: config.A_PRAISE,
+}
+
+
 class PolicyWrapper:
     """
     A class which acts as an interface between the raw policy and the behaviour tree. It can give the tree a behaviour
@@ -26,10 +228,12 @@ class PolicyWrapper:
     get_behaviour(state, goal_level, performance, phase)
         Obtain a behaviour from the underlying policy and check it is valid in the current state of interaction.
     _get_valid_list(goal_level, performance, phase)
-        Local method which creates the list of valid for each state of interaction.
+        Local method which looks up the set of valid behaviours for each state of interaction.
     get_observation(state, behaviour)
         Obtain an observation from the underlying policy.
     """
+    __slots__ = ('policy',)
+
     def __init__(self, belief=None, policy=None):
         self.policy = Policy(belief, policy)
 
@@ -42,234 +246,67 @@ class PolicyWrapper:
         :param phase :type int: the phase of the current goal level (either intro or feedback).
         :return behaviour :type int: the behaviour generated by the policy.
         """
-        if goal_level == config.ACTION_GOAL:
+        if goal_level == ACTION_GOAL:
             logging.debug("Action goal")
             logging.debug("performance = %s", performance)
 
+        if goal_level == PERSON_GOAL and phase == PHASE_END:
+            return A_END  # The only valid behaviour at the end of the interaction.
+
         valid_behaviours = self._get_valid_list(goal_level, performance, phase)
-        if goal_level == config.PERSON_GOAL and phase == config.PHASE_END:
-            behaviour = config.A_END
-        else:
+        if goal_level == ACTION_GOAL:
             behaviour = self.policy.sample_action(state)
+        else:
+            # Draw straight from the valid behaviours. Only if none of them can follow state do we fall through to the
+            # retry loop below, which moves on to a new state.
+            behaviour = self.policy.sample_valid_action(state, valid_behaviours)
+            if behaviour is None:
+                behaviour = self.policy.sample_action(state)
         # obs_behaviour = behaviour
         count = 0
         #if goal_level == config.ACTION_GOAL:
-        debugString = "behaviour = ", behaviour, ". valid_behaviours: %s", valid_behaviours
-        logging.debug(debugString)
+        logging.debug("behaviour = %s. valid_behaviours: %s", behaviour, valid_behaviours)
 
         while not(behaviour in valid_behaviours):
             logging.debug("Not valid behaviour")
-            if goal_level == config.ACTION_GOAL:     # If between shots, silence is an appropriate action so each time a
+            if goal_level == ACTION_GOAL:     # If between shots, silence is an appropriate action so each time a
                 logging.debug("behaviour == SILENCE")
-                behaviour = config.A_SILENCE  # non-valid action is proposed, just use silence.
+                behaviour = A_SILENCE  # non-valid action is proposed, just use silence.
             else:
                 if count <= 10:  # Only try this 10 times and if still no valid behaviour, try the next behaviour in the action sequence.
                     logging.debug("PolicyWrapper <= 10")
                     behaviour = self.policy.sample_action(state)
                 else:
                     logging.debug("PolicyWrapper > 10")
-                    # TODO: Remove this if else and figure out what's going on with centroids.
-                    if behaviour == config.A_MANUALMANIPULATION_QUESTIONING:
-                        behaviour = config.A_QUESTIONING
-                    elif behaviour == config.A_MANUALMANIPULATION_PREINSTRUCTION \
-                            or behaviour == config.A_PREINSTRUCTION_MANUALMANIPULATION:
-                        behaviour = config.A_PREINSTRUCTION
-                    elif behaviour == config.A_MANUALMANIPULATION_POSITIVEMODELING:
-                        behaviour = config.A_POSITIVEMODELING
-                    elif behaviour == config.A_MANUALMANIPULATION_CONCURRENTINSTRUCTIONNEGATIVE \
-                            or behaviour == config.A_CONCURRENTINSTRUCTIONNEGATIVE_MANUALMANIPULATION:
-                        behaviour = config.A_CONCURRENTINSTRUCTIONNEGATIVE
-                    elif behaviour == config.A_MANUALMANIPULATION_CONCURRENTINSTRUCTIONPOSITIVE \
-                            or behaviour == config.A_CONCURRENTINSTRUCTIONPOSITIVE_MANUALMANIPULATION:
-                        behaviour = config.A_CONCURRENTINSTRUCTIONPOSITIVE
-                    elif behaviour == config.A_MANUALMANIPULATION_CONSOLE:
-                        behaviour = config.A_CONSOLE
-                    elif behaviour == config.A_MANUALMANIPULATION_FIRSTNAME:
-                        behaviour = config.A_FIRSTNAME
-                    elif behaviour == config.A_MANUALMANIPULATION_HUSTLE:
-                        behaviour = config.A_HUSTLE
-                    elif behaviour == config.A_MANUALMANIPULATION_POSTINSTRUCTIONNEGATIVE \
-                            or behaviour == config.A_POSTINSTRUCTIONNEGATIVE_MANUALMANIPULATION:
-                        behaviour = config.A_POSTINSTRUCTIONNEGATIVE
-                    elif behaviour == config.A_MANUALMANIPULATION_POSTINSTRUCTIONPOSITIVE \
-                            or behaviour == config.A_POSTINSTRUCTIONPOSITIVE_MANUALMANIPULATION:
-                        behaviour = config.A_POSTINSTRUCTIONPOSITIVE
-                    elif behaviour == config.A_MANUALMANIPULATION_PRAISE:
-                        behaviour = config.A_PRAISE
+                    # TODO: Remove this fallback and figure out what's going on with centroids.
+                    fallback = _MM_FALLBACK.get(behaviour)
+                    if fallback is not None:
+                        behaviour = fallback
                     else:
-                        if behaviour == config.A_END:  # If behaviour == end then start from start again.
-                            behaviour = config.A_START
+                        if behaviour == A_END:  # If behaviour == end then start from start again.
+                            behaviour = A_START
                         state = self.policy.sample_observation(action=behaviour, state=state)
                         behaviour = self.policy.sample_action(state)
                         count = 0
                 count += 1
-                debugString = "behaviour = ", behaviour, ". valid_behaviours: %s", valid_behaviours
-                logging.debug(debugString)
+                logging.debug("behaviour = %s", behaviour)
 
         return behaviour  #, obs_behaviour
 
     def _get_valid_list(self, goal_level, performance, phase):
         """
-        Local method which creates the list of valid for each state of interaction.
+        Local method which looks up the set of valid behaviours for each state of interaction.
         :param goal_level :type int: the current goal level of the interaction.
         :param performance :type int: the performance of the user on their last action.
         :param phase :type int: the phase of the current goal level (either intro or feedback).
-        :return valid_list :type list[int]: a list of valid behaviours in the current interaction state.
+        :return valid_list :type frozenset[int]: the valid behaviours in the current interaction state.
         """
-        valid_list = []
-
-        logging.debug('Getting valid list, goal_level = ' + str(goal_level) + ', performance = ' + str(performance) + ', phase = ' + str(phase))
-        # Person Goal
-        if goal_level == config.PERSON_GOAL:
-            logging.debug('Creating list for person goal')
-            if phase == config.PHASE_START:
-                valid_list.extend([config.A_PREINSTRUCTION, config.A_PREINSTRUCTION_FIRSTNAME])
-            else:
-                valid_list.append(config.A_END)
-
-        # Baseline Goal
-        elif goal_level == config.BASELINE_GOAL:
-            if phase == config.PHASE_START:
-                valid_list.extend([config.A_PREINSTRUCTION, config.A_PREINSTRUCTION_QUESTIONING,
-                                   config.A_PREINSTRUCTION_FIRSTNAME,
-                                   config.A_PREINSTRUCTION_POSITIVEMODELING,
-                                   config.A_POSITIVEMODELING_PREINSTRUCTION])
-            else:
-                valid_list.append(config.A_PRAISE)
-
-        # Session, Exercise and Set Goals will all have the same action categories (different individual actions)
-        elif goal_level == config.SESSION_GOAL or goal_level == config.EXERCISE_GOAL or goal_level == config.STAT_GOAL or goal_level == config.SET_GOAL:
-            valid_list.extend([config.A_POSTINSTRUCTIONPOSITIVE, config.A_POSTINSTRUCTIONNEGATIVE,
-                               config.A_QUESTIONING, config.A_POSTINSTRUCTIONPOSITIVE_QUESTIONING,
-                               config.A_POSTINSTRUCTIONPOSITIVE_FIRSTNAME,
-                               config.A_POSTINSTRUCTIONNEGATIVE_QUESTIONING, config.A_QUESTIONING_FIRSTNAME,
-                               config.A_POSTINSTRUCTIONNEGATIVE_FIRSTNAME])
-            if goal_level == config.EXERCISE_GOAL or goal_level == config.STAT_GOAL or goal_level == config.SET_GOAL:
-                valid_list.extend([config.A_QUESTIONING_POSITIVEMODELING, config.A_POSITIVEMODELING_QUESTIONING,
-                                   config.A_POSTINSTRUCTIONPOSITIVE_POSITIVE_MODELING,
-                                   config.A_POSTINSTRUCTIONPOSITIVE_NEGATIVE_MODELING,
-                                   config.A_POSTINSTRUCTIONNEGATIVE_POSITIVEMODELING,
-                                   config.A_POSTINSTRUCTIONNEGATIVE_NEGATIVEMODELING,
-                                   config.A_QUESTIONING_NEGATIVEMODELING,
-                                   config.A_POSITIVEMODELING_POSTINSTRUCTIONPOSITIVE,
-                                   config.A_NEGATIVEMODELING_POSTINSTRUCTIONNEGATIVE])
-            if phase == config.PHASE_START:
-                valid_list.extend([config.A_PREINSTRUCTION, config.A_PREINSTRUCTION_QUESTIONING,
-                                   config.A_PREINSTRUCTION_FIRSTNAME])
-                if goal_level == config.EXERCISE_GOAL or goal_level == config.STAT_GOAL or goal_level == config.SET_GOAL:
-                    valid_list.extend([config.A_PREINSTRUCTION_POSITIVEMODELING,
-                                       config.A_PREINSTRUCTION_NEGATIVEMODELING,
-                                       config.A_POSITIVEMODELING_PREINSTRUCTION])
-                if performance == config.MET:
-                    valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME])
-                    if goal_level == config.EXERCISE_GOAL or goal_level == config.STAT_GOAL or goal_level == config.SET_GOAL:
-                        valid_list.extend(([config.A_POSITIVEMODELING_PRAISE]))
-                elif performance == config.MUCH_IMPROVED:
-                    valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME])
-                    if goal_level == config.EXERCISE_GOAL or goal_level == config.STAT_GOAL or goal_level == config.SET_GOAL:
-                        valid_list.extend(([config.A_POSITIVEMODELING_PRAISE]))
-                elif performance == config.IMPROVED:
-                    valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME])
-                    if goal_level == config.EXERCISE_GOAL or goal_level == config.STAT_GOAL or goal_level == config.SET_GOAL:
-                        valid_list.extend(([config.A_POSITIVEMODELING_PRAISE]))
-                elif performance == config.IMPROVED_SWAP:
-                    valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME])
-                    if goal_level == config.EXERCISE_GOAL or goal_level == config.STAT_GOAL or goal_level == config.SET_GOAL:
-                        valid_list.extend(([config.A_POSITIVEMODELING_PRAISE]))
-                elif performance == config.STEADY:
-                    valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME])
-                    if goal_level == config.EXERCISE_GOAL or goal_level == config.STAT_GOAL or goal_level == config.SET_GOAL:
-                        valid_list.extend(([config.A_POSITIVEMODELING_PRAISE]))
-                elif performance == config.REGRESSED:
-                    valid_list.extend([config.A_SCOLD, config.A_CONSOLE, config.A_SCOLD_FIRSTNAME,
-                                       config.A_CONSOLE_FIRSTNAME])
-                elif performance == config.REGRESSED_SWAP:
-                    valid_list.extend([config.A_SCOLD, config.A_CONSOLE, config.A_SCOLD_FIRSTNAME,
-                                       config.A_CONSOLE_FIRSTNAME])
-                elif performance == config.MUCH_REGRESSED:  # performance == config.MUCH_REGRESSED
-                    valid_list.extend([config.A_SCOLD, config.A_CONSOLE, config.A_SCOLD_FIRSTNAME,
-                                       config.A_CONSOLE_FIRSTNAME])
-            else:  # phase == config.PHASE_END
-                if goal_level == config.SESSION_GOAL:
-                    valid_list.append(config.A_END)
-                if performance == config.MET:
-                    valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME,
-                                       config.A_POSITIVEMODELING_PRAISE])
-                elif performance == config.MUCH_IMPROVED:
-                    valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME,
-                                       config.A_POSITIVEMODELING_PRAISE])
-                elif performance == config.IMPROVED:
-                    valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME,
-                                       config.A_POSITIVEMODELING_PRAISE])
-                elif performance == config.IMPROVED_SWAP:
-                    valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME,
-                                       config.A_POSITIVEMODELING_PRAISE])
-                elif performance == config.STEADY:
-                    valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME,
-                                       config.A_POSITIVEMODELING_PRAISE])
-                elif performance == config.REGRESSED:
-                    valid_list.extend([config.A_SCOLD, config.A_CONSOLE, config.A_SCOLD_FIRSTNAME,
-                                       config.A_CONSOLE_FIRSTNAME])
-                elif performance == config.REGRESSED_SWAP:
-                    valid_list.extend([config.A_SCOLD, config.A_CONSOLE, config.A_SCOLD_FIRSTNAME,
-                                       config.A_CONSOLE_FIRSTNAME])
-                elif performance == config.MUCH_REGRESSED:  # performance == config.MUCH_REGRESSED
-                    valid_list.extend([config.A_SCOLD, config.A_CONSOLE, config.A_SCOLD_FIRSTNAME,
-                                       config.A_CONSOLE_FIRSTNAME])
-
-        # Action Goal (each shot in squash or repetition of exercise in rehab)
-        else:  # goal_level == config.ACTION_GOAL:
-            valid_list.extend([config.A_SILENCE, config.A_CONCURRENTINSTRUCTIONPOSITIVE,
-                               config.A_QUESTIONING, config.A_POSITIVEMODELING, config.A_HUSTLE,
-                               config.A_CONCURRENTINSTRUCTIONPOSITIVE_QUESTIONING,
-                               config.A_CONCURRENTINSTRUCTIONPOSITIVE_FIRSTNAME,
-                               config.A_QUESTIONING_FIRSTNAME, config.A_HUSTLE_FIRSTNAME,
-                               config.A_CONCURRENTINSTRUCTIONPOSITIVE_POSITIVEMODELING,
-                               config.A_POSITIVEMODELING_HUSTLE,
-                               config.A_POSITIVEMODELING_CONCURRENTINSTRUCTIONPOSITIVE])
-            # No phases in action goals, just a behaviour after each shot.
-            if performance == config.MET:
-                valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME,
-                                   config.A_CONCURRENTINSTRUCTIONPOSITIVE_PRAISE,
-                                   config.A_POSITIVEMODELING_PRAISE])
-            elif performance == config.MUCH_IMPROVED:
-                valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME,
-                                   config.A_CONCURRENTINSTRUCTIONPOSITIVE_PRAISE,
-                                   config.A_POSITIVEMODELING_PRAISE])
-            elif performance == config.IMPROVED:
-                valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME,
-                                   config.A_CONCURRENTINSTRUCTIONPOSITIVE_PRAISE,
-                                   config.A_POSITIVEMODELING_PRAISE])
-            elif performance == config.IMPROVED_SWAP:
-                valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME,
-                                   config.A_CONCURRENTINSTRUCTIONPOSITIVE_PRAISE,
-                                   config.A_POSITIVEMODELING_PRAISE])
-            elif performance == config.STEADY:
-                valid_list.extend([config.A_PRAISE, config.A_PRAISE_FIRSTNAME,
-                                   config.A_CONCURRENTINSTRUCTIONPOSITIVE_PRAISE,
-                                   config.A_POSITIVEMODELING_PRAISE])
-            elif performance == config.REGRESSED:
-                valid_list.extend([config.A_CONCURRENTINSTRUCTIONNEGATIVE, config.A_NEGATIVEMODELING,
-                                   config.A_SCOLD, config.A_CONSOLE,
-                                   config.A_QUESTIONING_NEGATIVEMODELING, config.A_SCOLD_POSITIVEMODELING,
-                                   config.A_SCOLD_FIRSTNAME, config.A_CONSOLE_FIRSTNAME,
-                                   config.A_CONCURRENTINSTRUCTIONNEGATIVE_NEGATIVEMODELING,
-                                   config.A_CONCURRENTINSTRUCTIONNEGATIVE_FIRSTNAME,])
-            elif performance == config.REGRESSED_SWAP:
-                valid_list.extend([config.A_CONCURRENTINSTRUCTIONNEGATIVE, config.A_NEGATIVEMODELING,
-                                   config.A_SCOLD, config.A_CONSOLE,
-                                   config.A_QUESTIONING_NEGATIVEMODELING, config.A_SCOLD_POSITIVEMODELING,
-                                   config.A_SCOLD_FIRSTNAME, config.A_CONSOLE_FIRSTNAME,
-                                   config.A_CONCURRENTINSTRUCTIONNEGATIVE_NEGATIVEMODELING,
-                                   config.A_CONCURRENTINSTRUCTIONNEGATIVE_FIRSTNAME])
-            elif performance == config.MUCH_REGRESSED:  # performance == config.MUCH_REGRESSED
-                valid_list.extend([config.A_CONCURRENTINSTRUCTIONNEGATIVE, config.A_NEGATIVEMODELING,
-                                   config.A_SCOLD, config.A_CONSOLE,
-                                   config.A_QUESTIONING_NEGATIVEMODELING, config.A_SCOLD_POSITIVEMODELING,
-                                   config.A_SCOLD_FIRSTNAME, config.A_CONSOLE_FIRSTNAME,
-                                   config.A_CONCURRENTINSTRUCTIONNEGATIVE_NEGATIVEMODELING,
-                                   config.A_CONCURRENTINSTRUCTIONNEGATIVE_FIRSTNAME])
-
+        logging.debug('Getting valid list, goal_level = %s, performance = %s, phase = %s', goal_level, performance,
+                      phase)
+        key = (goal_level, performance, phase)
+        valid_list = _VALID.get(key)
+        if valid_list is None:  # e.g. performance is None at the very start of a session.
+            valid_list = _VALID[key] = frozenset(_build_valid_list(goal_level, performance, phase))
         return valid_list
 
     def get_observation(self, state, behaviour):